@@ -8,7 +8,7 @@ from advanced_view import TowerView
 from model import TowerGame
 from tower import SimpleTower, MissileTower, PulseTower, AbstractTower
 from enemy import SimpleEnemy
-from utilities import Stepper
+from stepper import Stepper
 from view import GameView
 from level import AbstractLevel
 from levels import MyLevel, IntermediateLevel, AdvancedLevel
@@ -403,9 +403,8 @@ class TowerGameApp(Stepper):
 
         legal, grid_path = self._game.attempt_placement(position)
 
-        # find the best path and covert positions to pixel positions
-        path = [self._game.grid.cell_to_pixel_centre(position)
-                for position in grid_path.get_shortest()]
+        # best path in pixel positions, cached on the path (previews are themselves cached)
+        path = grid_path.get_polyline(self._game.grid.cell_size).points
 
         # Task 1.2 (Tower placement): Draw the tower preview here
         self._view.draw_preview(self._current_tower, legal)
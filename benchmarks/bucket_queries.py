@@ -0,0 +1,85 @@
+"""
+Benchmarks tower range queries against fixed (10x10) & adaptive enemy buckets,
+across grid sizes & enemy counts
+
+Enemies are scattered uniformly over the grid & queried from randomly placed
+SimpleTowers (CircularRange(1.5)), as in TowerGame._step_towers
+
+Usage (from the project root):
+    python -m benchmarks.bucket_queries [--queries N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+from core import UnitManager, AdaptiveUnitManager
+from enemy import SimpleEnemy
+from tower import SimpleTower
+
+CELL_SIZE = 60
+GRID_SIZES = (6, 50, 200)
+ENEMY_COUNTS = (100, 1000, 10000)
+
+
+def populate(manager, pixels, count, rng):
+    """Adds 'count' enemies at random positions within 'pixels' to 'manager'"""
+    width, height = pixels
+    for _ in range(count):
+        enemy = SimpleEnemy()
+        enemy.set_cell_size(CELL_SIZE)
+        enemy.position = rng.randrange(width), rng.randrange(height)
+        manager.update_unit(enemy)
+
+    if isinstance(manager, AdaptiveUnitManager):
+        while manager.rebalance():
+            pass
+
+
+def time_queries(manager, towers):
+    """(float, float) Returns the mean time (seconds) per tower query & the mean number of enemies found"""
+    found = 0
+    start = time.perf_counter()
+    for tower in towers:
+        found += sum(1 for _ in tower.get_units_in_range(manager))
+    elapsed = time.perf_counter() - start
+
+    return elapsed / len(towers), found / len(towers)
+
+
+def main(argv=None):
+    """Runs the bucket query benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=200, help="Tower queries per measurement")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    print("{:>9} {:>8} | {:>12} {:>12} | {:>8} {:>10}".format(
+        "grid", "enemies", "fixed (us)", "adaptive (us)", "speedup", "in range"))
+
+    for cells in GRID_SIZES:
+        pixels = cells * CELL_SIZE, cells * CELL_SIZE
+
+        for count in ENEMY_COUNTS:
+            rng = random.Random(args.seed)
+            towers = []
+            for _ in range(args.queries):
+                tower = SimpleTower(CELL_SIZE)
+                tower.position = rng.randrange(pixels[0]), rng.randrange(pixels[1])
+                towers.append(tower)
+
+            fixed = UnitManager(pixels)
+            adaptive = AdaptiveUnitManager(pixels, CELL_SIZE)
+            for manager in (fixed, adaptive):
+                populate(manager, pixels, count, random.Random(args.seed))
+
+            fixed_time, found = time_queries(fixed, towers)
+            adaptive_time, _ = time_queries(adaptive, towers)
+
+            print("{:>9} {:>8} | {:>12.1f} {:>13.1f} | {:>7.1f}x {:>10.1f}".format(
+                "{0}x{0}".format(cells), count, fixed_time * 1e6, adaptive_time * 1e6,
+                fixed_time / adaptive_time, found))
+
+
+if __name__ == "__main__":
+    main()
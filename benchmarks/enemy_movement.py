@@ -0,0 +1,97 @@
+"""
+Benchmarks moving every enemy a single step, cell by cell, by arc-length one
+enemy at a time, and by arc-length all at once through the numpy enemy store
+
+Enemies are spread evenly along a long, straight path, with more health than
+any tower deals, and no towers, so only movement is measured. Before timing,
+checks that a slowed enemy moves the same distance one at a time as batched
+
+Usage (from the project root):
+    python -m benchmarks.enemy_movement [--steps N]
+"""
+
+import argparse
+import time
+
+from enemy import SimpleEnemy
+from model import TowerGame
+
+CELL_SIZE = 60
+PATH_CELLS = 200
+
+ENEMY_COUNTS = (1000, 10000, 50000)
+
+
+def time_steps(enemy_count, steps, **options):
+    """(float) Returns the mean time (in seconds) to step 'enemy_count' enemies, in a game
+    constructed with 'options'"""
+    game = TowerGame(size=(PATH_CELLS, 3), cell_size=CELL_SIZE, **options)
+    polyline = game.path.get_polyline(CELL_SIZE)
+
+    for i in range(enemy_count):
+        enemy = SimpleEnemy(health=float('inf'))
+        enemy.set_cell_size(CELL_SIZE)
+        # stop short of the end, so no enemy escapes while timing
+        enemy.position = polyline.get_position(CELL_SIZE + i / enemy_count * (polyline.length - 3 * CELL_SIZE))
+        game.enemies.append(enemy)
+
+    # first step projects every enemy onto the path
+    game._step_enemies()  # pylint: disable=protected-access
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        game._step_enemies()  # pylint: disable=protected-access
+    return (time.perf_counter() - start) / steps
+
+
+def check_slowed_enemy():
+    """Checks that an enemy slowed between steps (i.e. by an AdvancedTower) moves the same
+    distance by arc-length one at a time as through the enemy store
+
+    Raises:
+        AssertionError if the distances differ
+    """
+    moved = []
+    for options in ({}, {'enemy_store': True}):
+        game = TowerGame(size=(PATH_CELLS, 3), cell_size=CELL_SIZE, arc_length=True, **options)
+
+        enemy = SimpleEnemy()
+        enemy.set_cell_size(CELL_SIZE)
+        enemy.position = game.path.get_polyline(CELL_SIZE).get_position(CELL_SIZE)
+        game.enemies.append(enemy)
+
+        # first step projects the enemy onto the path
+        game._step_enemies()  # pylint: disable=protected-access
+        enemy.grid_speed /= 4
+
+        travelled = enemy.travelled
+        game._step_enemies()  # pylint: disable=protected-access
+        moved.append(enemy.travelled - travelled)
+
+    one_at_a_time, batched = moved
+    assert abs(one_at_a_time - batched) < 1e-9, \
+        f"Slowed enemy moved {one_at_a_time} one at a time, but {batched} batched"
+
+
+def main(argv=None):
+    """Runs the enemy movement benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=10, help="Number of steps to time")
+    args = parser.parse_args(argv)
+
+    check_slowed_enemy()
+
+    print("{:>8} | {:>10} {:>16} {:>13} | {:>8}".format(
+        "enemies", "cells (ms)", "arc-length (ms)", "batched (ms)", "speedup"))
+
+    for enemy_count in ENEMY_COUNTS:
+        cells = time_steps(enemy_count, args.steps)
+        arc_length = time_steps(enemy_count, args.steps, arc_length=True)
+        batched = time_steps(enemy_count, args.steps, arc_length=True, enemy_store=True)
+
+        print("{:>8} | {:>10.2f} {:>16.2f} {:>13.2f} | {:>7.1f}x".format(
+            enemy_count, cells * 1000, arc_length * 1000, batched * 1000, cells / batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmarks stepping homing missiles, one at a time through Missile.step, and
+all at once through missile_batch.step_missiles
+
+Missiles chase enemies that can't be killed, from far enough away that none
+reach their target while timing, so only movement is measured
+
+Usage (from the project root):
+    python -m benchmarks.missile_kinematics [--steps N]
+"""
+
+import argparse
+import random
+import time
+
+from enemy import SimpleEnemy
+from missile_batch import step_missiles
+from tower import Missile
+
+CELL_SIZE = 60
+
+MISSILE_COUNTS = (1000, 10000, 50000)
+TARGET_COUNT = 100
+
+
+def make_missiles(count):
+    """(list<Missile>) Returns 'count' missiles, each chasing one of a shared set of targets"""
+    rng = random.Random(0)
+
+    targets = []
+    for _ in range(TARGET_COUNT):
+        target = SimpleEnemy(health=float('inf'))
+        target.set_cell_size(CELL_SIZE)
+        target.position = rng.uniform(-1e5, 1e5), rng.uniform(-1e5, 1e5)
+        targets.append(target)
+
+    return [Missile((rng.uniform(0, 1000), rng.uniform(0, 1000)), CELL_SIZE, rng.choice(targets),
+                    rotation=rng.uniform(-3, 3), grid_speed=.3) for _ in range(count)]
+
+
+def time_steps(step, count, steps):
+    """(float) Returns the mean time (in seconds) for 'step' to step 'count' missiles"""
+    missiles = make_missiles(count)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        step(missiles)
+    return (time.perf_counter() - start) / steps
+
+
+def step_each(missiles):
+    """Steps each missile in turn"""
+    for missile in missiles:
+        missile.step(None)
+
+
+def main(argv=None):
+    """Runs the missile kinematics benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=10, help="Number of steps to time")
+    args = parser.parse_args(argv)
+
+    print("{:>9} | {:>9} {:>13} | {:>8}".format("missiles", "each (ms)", "batched (ms)", "speedup"))
+
+    for count in MISSILE_COUNTS:
+        each = time_steps(step_each, count, args.steps)
+        batched = time_steps(step_missiles, count, args.steps)
+
+        print("{:>9} | {:>9.2f} {:>13.2f} | {:>7.1f}x".format(count, each * 1000, batched * 1000, each / batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmarks generating a path from scratch with each path backend
+(see TowerGame.PATH_BACKENDS), relative to the default (dict) backend
+
+Towers are scattered over a tenth of each grid, leaving the start row clear so
+that a path always exists
+
+Usage (from the project root):
+    python -m benchmarks.path_build [--repeats N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+from model import TowerGame
+
+GRID_SIZES = ((6, 6), (50, 50), (500, 500))
+
+
+def time_generate(game, repeats):
+    """(float) Returns the mean time (seconds) taken for 'game' to generate its path"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        game.generate_path()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(argv=None):
+    """Runs the path building benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3, help="Paths generated per measurement")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    print("{:>9} | ".format("grid") + " ".join("{:>18}".format(backend + " (ms)")
+                                              for backend in TowerGame.PATH_BACKENDS))
+
+    for size in GRID_SIZES:
+        rng = random.Random(args.seed)
+        columns, rows = size
+
+        towers = {(rng.randrange(columns), rng.randrange(rows)) for _ in range(columns * rows // 10)}
+        towers = {(column, row) for column, row in towers if row != 1}
+
+        times = []
+        for backend in TowerGame.PATH_BACKENDS:
+            game = TowerGame(size=size, path_backend=backend)
+            game.towers.update(dict.fromkeys(towers))
+            times.append(time_generate(game, args.repeats))
+
+        print("{:>9} | ".format("{}x{}".format(*size)) + " ".join(
+            "{:>10.2f} ({:>4.1f}x)".format(elapsed * 1000, times[0] / elapsed) for elapsed in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmarks the memory held by a path, & the cost of copying it, for the
+dict-based path versus the compact (array-encoded) path
+
+Towers are scattered over a tenth of each grid, leaving the start row clear so
+that a path always exists
+
+Usage (from the project root):
+    python -m benchmarks.path_memory [--seed S]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from model import TowerGame
+
+GRID_SIZES = ((6, 6), (50, 50), (500, 500))
+
+
+def measure(game):
+    """(int, float) Returns the bytes allocated to generate a path for 'game' & the time (seconds) to copy it"""
+    tracemalloc.start()
+    path = game.generate_path()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    path.copy()
+    return size, time.perf_counter() - start
+
+
+def main(argv=None):
+    """Runs the path memory benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    print("{:>9} | {:>10} {:>12} | {:>13} {:>12} | {:>7}".format(
+        "grid", "dict (KiB)", "copy (ms)", "compact (KiB)", "copy (ms)", "ratio"))
+
+    for size in GRID_SIZES:
+        rng = random.Random(args.seed)
+        columns, rows = size
+
+        towers = {(rng.randrange(columns), rng.randrange(rows)) for _ in range(columns * rows // 10)}
+        towers = {(column, row) for column, row in towers if row != 1}
+
+        results = []
+        for backend in ('dict', 'compact'):
+            game = TowerGame(size=size, path_backend=backend)
+            game.towers.update(dict.fromkeys(towers))
+            results.append(measure(game))
+
+        (dict_size, dict_copy), (compact_size, compact_copy) = results
+        print("{:>9} | {:>10.1f} {:>12.3f} | {:>13.1f} {:>12.3f} | {:>6.1f}x".format(
+            "{}x{}".format(*size), dict_size / 1024, dict_copy * 1000, compact_size / 1024,
+            compact_copy * 1000, dict_size / compact_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmarks placing & removing towers with a full path regeneration versus
+repairing the existing path around the changed cell
+
+Towers are scattered over roughly a fifth of each grid (keeping the start row
+clear, so a path always exists) before timing random placements & removals
+
+Usage (from the project root):
+    python -m benchmarks.path_repair [--changes N] [--seed S] [--backend B] [--size C R]
+"""
+
+import argparse
+import random
+import time
+
+from model import TowerGame
+from tower import SimpleTower
+
+GRID_SIZES = ((6, 6), (50, 50), (100, 100))
+
+
+def main(argv=None):
+    """Runs the path repair benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--changes', type=int, default=50, help="Placements (& removals) per measurement")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--backend', choices=TowerGame.PATH_BACKENDS, default='dict',
+                        help="The path backend to generate paths with")
+    parser.add_argument('--size', type=int, nargs=2, action='append', metavar=('COLUMNS', 'ROWS'),
+                        help="A grid size to measure (repeatable; default: 6x6, 50x50 & 100x100)")
+    args = parser.parse_args(argv)
+
+    print("{:>9} {:>7} | {:>15} {:>12} | {:>8}".format(
+        "grid", "towers", "regenerate (ms)", "repair (ms)", "speedup"))
+
+    for size in args.size or GRID_SIZES:
+        rng = random.Random(args.seed)
+        game = TowerGame(size=size, path_backend=args.backend)
+
+        # towers are added in bulk (keeping the start row clear) rather than placed one at a time
+        columns, rows = size
+        towers = {(rng.randrange(columns), rng.randrange(rows)) for _ in range(columns * rows // 5)}
+        game.towers.update((cell, SimpleTower(game.grid.cell_size)) for cell in towers if cell[1] != 1)
+        game._set_path(game.generate_path())  # pylint: disable=protected-access
+
+        free = [(column, row) for column in range(columns) for row in range(rows)
+                if (column, row) not in game.towers]
+        cells = rng.sample(free, min(args.changes, len(free)))
+
+        # a full regeneration to check legality & another for the new path, as place used to
+        start = time.perf_counter()
+        for cell in cells:
+            try:
+                game.generate_path(cell)
+            except KeyError:
+                continue
+            game.generate_path(cell)
+        regenerate_time = (time.perf_counter() - start) / len(cells)
+
+        start = time.perf_counter()
+        for cell in cells:
+            if game.place(cell, tower_type=SimpleTower):
+                game.remove(cell)
+        repair_time = (time.perf_counter() - start) / len(cells)
+
+        print("{:>9} {:>7} | {:>15.3f} {:>12.3f} | {:>7.1f}x".format(
+            "{}x{}".format(*size), len(game.towers), regenerate_time * 1000, repair_time * 1000,
+            regenerate_time / repair_time))
+
+
+if __name__ == "__main__":
+    main()
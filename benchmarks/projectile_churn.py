@@ -0,0 +1,75 @@
+"""
+Benchmarks creating & expiring missiles & pulses, with & without a projectile pool
+
+A grid of pulse & missile towers fire at a crowd of enemies that can't be
+killed, so projectiles are created & expire continuously. Reports the time per
+step & the number of (generation 0) garbage collections run
+
+Usage (from the project root):
+    python -m benchmarks.projectile_churn [--steps N]
+"""
+
+import argparse
+import gc
+import time
+
+from enemy import SimpleEnemy
+from model import TowerGame
+from tower import MissileTower, PulseTower
+
+CELL_SIZE = 60
+GRID_SIZE = (40, 40)
+
+
+def run(steps, **options):
+    """Returns the mean time (in seconds) per step, the number of gen 0 collections & the game,
+    after 'steps' steps of a game constructed with 'options'"""
+    game = TowerGame(size=GRID_SIZE, cell_size=CELL_SIZE, **options)
+
+    columns, rows = GRID_SIZE
+    for column in range(2, columns - 2, 3):
+        for row in range(2, rows - 2, 3):
+            tower = (PulseTower if (column + row) % 2 else MissileTower)(CELL_SIZE)
+            tower.position = game.grid.cell_to_pixel_centre((column, row))
+            game.towers[column, row] = tower
+    game._set_path(game.generate_path())  # pylint: disable=protected-access
+
+    for column in range(columns):
+        for row in range(rows):
+            enemy = SimpleEnemy(health=float('inf'), grid_speed=0)
+            enemy.set_cell_size(CELL_SIZE)
+            enemy.position = game.grid.cell_to_pixel_centre((column, row))
+            game.enemies.append(enemy)
+            game._data.enemies.add_unit(enemy)  # pylint: disable=protected-access
+
+    collections = gc.get_stats()[0]['collections']
+    start = time.perf_counter()
+    for _ in range(steps):
+        game._step_towers()  # pylint: disable=protected-access
+        game._step_obstacles()  # pylint: disable=protected-access
+    elapsed = time.perf_counter() - start
+
+    return elapsed / steps, gc.get_stats()[0]['collections'] - collections, game
+
+
+def main(argv=None):
+    """Runs the projectile churn benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=200, help="Number of steps to time")
+    args = parser.parse_args(argv)
+
+    print("{:>8} | {:>10} {:>14} {:>12} | {:>9} {:>9}".format(
+        "pool", "step (ms)", "gen 0 (count)", "obstacles", "created", "recycled"))
+
+    for pool in (False, True):
+        step, collections, game = run(args.steps, projectile_pool=pool)
+        projectile_pool = game._data.projectile_pool  # pylint: disable=protected-access
+        created, recycled = ((projectile_pool.created, projectile_pool.recycled)
+                             if projectile_pool is not None else ("-", "-"))
+
+        print("{:>8} | {:>10.2f} {:>14} {:>12} | {:>9} {:>9}".format(
+            str(pool), step * 1000, collections, len(game.obstacles), created, recycled))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmarks colliding pulses with enemies, one pulse at a time through the
+enemy buckets, and all at once through the numpy enemy store
+
+Pulses are fired in every direction from across a large grid crowded with
+enemies that can't be killed or move, and never expire from hits, so only
+collisions are measured
+
+Usage (from the project root):
+    python -m benchmarks.pulse_collisions [--steps N]
+"""
+
+import argparse
+import random
+import time
+
+from enemy import SimpleEnemy
+from model import TowerGame
+from tower import Pulse
+
+CELL_SIZE = 60
+GRID_SIZE = (100, 100)
+
+# (pulse count, enemy count) pairs
+COUNTS = ((1000, 10000), (5000, 50000))
+
+
+def time_steps(pulse_count, enemy_count, steps, **options):
+    """(float) Returns the mean time (in seconds) to step 'pulse_count' pulses among 'enemy_count'
+    enemies, in a game constructed with 'options'"""
+    game = TowerGame(size=GRID_SIZE, cell_size=CELL_SIZE, **options)
+    width, height = game.grid.pixels
+
+    rng = random.Random(0)
+    for _ in range(enemy_count):
+        enemy = SimpleEnemy(health=float('inf'), grid_speed=0)
+        enemy.set_cell_size(CELL_SIZE)
+        enemy.position = rng.uniform(0, width), rng.uniform(0, height)
+        game.enemies.append(enemy)
+        game._data.enemies.add_unit(enemy)  # pylint: disable=protected-access
+
+    for i in range(pulse_count):
+        # start far enough in from the edges to stay on the grid while timing
+        position = rng.uniform(.25, .75) * width, rng.uniform(.25, .75) * height
+        game.obstacles.append(Pulse(position, CELL_SIZE, Pulse.DIRECTIONS[i % 4], hits=0))
+
+    store = game._data.enemy_store  # pylint: disable=protected-access
+    if store is not None:
+        store.sync(game.enemies)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        game._step_obstacles()  # pylint: disable=protected-access
+    return (time.perf_counter() - start) / steps
+
+
+def main(argv=None):
+    """Runs the pulse collision benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=5, help="Number of steps to time")
+    args = parser.parse_args(argv)
+
+    print("{:>7} {:>8} | {:>12} {:>13} | {:>8}".format("pulses", "enemies", "buckets (ms)", "batched (ms)",
+                                                        "speedup"))
+
+    for pulse_count, enemy_count in COUNTS:
+        buckets = time_steps(pulse_count, enemy_count, args.steps)
+        batched = time_steps(pulse_count, enemy_count, args.steps, enemy_store=True)
+
+        print("{:>7} {:>8} | {:>12.2f} {:>13.2f} | {:>7.1f}x".format(
+            pulse_count, enemy_count, buckets * 1000, batched * 1000, buckets / batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmarks cold import time of the simulation core and of the GUI application
+
+Each measurement imports the modules in a fresh interpreter, so nothing is
+cached in sys.modules between runs
+
+Usage (from the project root):
+    python -m benchmarks.startup [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules which must be importable without a GUI
+CORE_MODULES = ('model', 'tower', 'enemy', 'custom', 'levels', 'path')
+GUI_MODULES = ('a3',)
+
+# Run in a child interpreter; prints elapsed seconds & whether tkinter was loaded
+PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(time.perf_counter() - start, 'tkinter' in sys.modules)
+"""
+
+
+def time_import(modules):
+    """(float, bool) Returns the time taken to import 'modules' in a fresh interpreter,
+    and whether doing so imported tkinter"""
+    output = subprocess.run([sys.executable, '-c', PROBE.format(modules=modules)], cwd=ROOT,
+                            check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    elapsed, tkinter_loaded = output.split()
+    return float(elapsed), tkinter_loaded == 'True'
+
+
+def benchmark(label, modules, repeat):
+    """Prints import timings for 'modules', over 'repeat' fresh interpreters"""
+    timings = []
+    tkinter_loaded = False
+    for _ in range(repeat):
+        elapsed, loaded = time_import(modules)
+        timings.append(elapsed)
+        tkinter_loaded |= loaded
+
+    print("{:<6} min {:7.2f} ms  median {:7.2f} ms  tkinter imported: {}".format(
+        label, min(timings) * 1000, statistics.median(timings) * 1000, tkinter_loaded))
+
+    return tkinter_loaded
+
+
+def main(argv=None):
+    """Runs the startup benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help="Fresh interpreters per measurement")
+    args = parser.parse_args(argv)
+
+    core_uses_tkinter = benchmark('core', CORE_MODULES, args.repeat)
+
+    try:
+        benchmark('a3', GUI_MODULES, args.repeat)
+    except subprocess.CalledProcessError:
+        print("a3     unavailable (tkinter could not be imported)")
+
+    if core_uses_tkinter:
+        sys.exit("Simulation core imported tkinter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmarks stepping every tower each step versus only the towers a
+TowerScheduler wakes
+
+Towers of each type fill a large grid, around a straight path along one row,
+so most are out of range of every enemy (or cooling down) at any time, as in
+a late game. Reports the mean time of the towers phase of a step
+
+Usage (from the project root):
+    python -m benchmarks.tower_scheduling [--steps N] [--enemies N]
+"""
+
+import argparse
+import time
+
+from enemy import SimpleEnemy
+from level import AbstractLevel
+from model import TowerGame
+from tower import SimpleTower, MissileTower, PulseTower
+
+CELL_SIZE = 60
+
+# (columns, rows) of each grid to measure
+GRID_SIZES = ((30, 20), (60, 40), (100, 60))
+
+TOWER_TYPES = (SimpleTower, MissileTower, PulseTower)
+
+
+def run(size, steps, enemy_count, **options):
+    """Returns the mean time (in seconds) of the towers phase & the mean number of towers stepped,
+    over 'steps' steps of a game of 'size' constructed with 'options'"""
+    game = TowerGame(size=size, cell_size=CELL_SIZE, **options)
+
+    # every other cell, keeping the path's row (& its neighbours) clear
+    columns, rows = size
+    for column in range(0, columns, 2):
+        for row in range(3, rows, 2):
+            tower = TOWER_TYPES[(column + row) % len(TOWER_TYPES)](CELL_SIZE)
+            tower.position = game.grid.cell_to_pixel_centre((column, row))
+            game.towers[column, row] = tower
+    game._set_path(game.generate_path())  # pylint: disable=protected-access
+
+    # with enough health to last the whole run
+    wave = AbstractLevel.generate_sub_waves([(steps, enemy_count, SimpleEnemy, (), {'health': 1e6})])
+    for _, enemy in wave:
+        enemy.set_cell_size(CELL_SIZE)
+    game.queue_wave(wave)
+
+    stepped = 0
+    elapsed = 0
+    for _ in range(steps):
+        game._current_step += 1  # pylint: disable=protected-access
+        game._update_unit_managers()  # pylint: disable=protected-access
+        game._step_obstacles()  # pylint: disable=protected-access
+        game._step_enemies()  # pylint: disable=protected-access
+
+        start = time.perf_counter()
+        game._step_towers()  # pylint: disable=protected-access
+        elapsed += time.perf_counter() - start
+
+        scheduler = game._tower_scheduler  # pylint: disable=protected-access
+        stepped += len(game.towers) if scheduler is None else len(scheduler)
+        game._spawn_enemies()  # pylint: disable=protected-access
+
+    return elapsed / steps, stepped / steps
+
+
+def main(argv=None):
+    """Runs the tower scheduling benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=300, help="Number of steps to time")
+    parser.add_argument('--enemies', type=int, default=200, help="Number of enemies spawned over the steps")
+    args = parser.parse_args(argv)
+
+    print("{:>9} {:>7} | {:>13} {:>15} {:>12} | {:>8}".format(
+        "grid", "towers", "every (ms)", "scheduled (ms)", "awake (avg)", "speedup"))
+
+    for size in GRID_SIZES:
+        every, tower_count = run(size, args.steps, args.enemies)
+        scheduled, awake = run(size, args.steps, args.enemies, tower_scheduler=True)
+
+        print("{:>9} {:>7.0f} | {:>13.3f} {:>15.3f} {:>12.1f} | {:>7.1f}x".format(
+            "{}x{}".format(*size), tower_count, every * 1000, scheduled * 1000, awake, every / scheduled))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmarks finding the enemies in-range of every tower, per tower through
+(adaptive) buckets versus a single batched query of the numpy enemy store
+
+The store is synced once per step regardless of the number of towers, so its
+sync time is reported separately from the query itself
+
+Usage (from the project root):
+    python -m benchmarks.tower_targeting [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+from core import AdaptiveUnitManager
+from enemy import SimpleEnemy
+from enemy_store import EnemyStore
+from tower import SimpleTower, MissileTower, PulseTower
+
+CELL_SIZE = 60
+GRID_CELLS = 200
+
+# (towers, enemies) pairs to measure
+SCENARIOS = ((100, 1000), (100, 10000), (500, 10000), (500, 50000))
+
+
+def main(argv=None):
+    """Runs the tower targeting benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    pixels = GRID_CELLS * CELL_SIZE, GRID_CELLS * CELL_SIZE
+
+    print("{:>7} {:>8} | {:>12} {:>10} {:>11} | {:>8}".format(
+        "towers", "enemies", "buckets (ms)", "sync (ms)", "query (ms)", "speedup"))
+
+    for tower_count, enemy_count in SCENARIOS:
+        rng = random.Random(args.seed)
+
+        enemies = []
+        for _ in range(enemy_count):
+            enemy = SimpleEnemy()
+            enemy.set_cell_size(CELL_SIZE)
+            enemy.position = rng.randrange(pixels[0]), rng.randrange(pixels[1])
+            enemies.append(enemy)
+
+        towers = []
+        for i in range(tower_count):
+            tower = (SimpleTower, MissileTower, PulseTower)[i % 3](CELL_SIZE)
+            tower.position = rng.randrange(pixels[0]), rng.randrange(pixels[1])
+            towers.append(tower)
+
+        manager = AdaptiveUnitManager(pixels, CELL_SIZE)
+        for enemy in enemies:
+            manager.update_unit(enemy)
+        while manager.rebalance():
+            pass
+
+        start = time.perf_counter()
+        for tower in towers:
+            list(tower.get_units_in_range(manager))
+        buckets_time = time.perf_counter() - start
+
+        store = EnemyStore(pixels)
+        start = time.perf_counter()
+        store.sync(enemies)
+        sync_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.get_all_in_range(towers)
+        query_time = time.perf_counter() - start
+
+        print("{:>7} {:>8} | {:>12.2f} {:>10.2f} {:>11.2f} | {:>7.1f}x".format(
+            tower_count, enemy_count, buckets_time * 1000, sync_time * 1000, query_time * 1000,
+            buckets_time / query_time))
+
+
+if __name__ == "__main__":
+    main()
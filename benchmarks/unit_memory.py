@@ -0,0 +1,85 @@
+"""
+Benchmarks the memory held per enemy & per projectile, & the time taken to
+create them, at the scale of large waves
+
+Creation is timed separately, as tracing memory slows it. Each unit is
+measured as created by the game: enemies as generate_sub_waves
+makes them (then sized to the grid, as a simulation does), projectiles as
+towers fire them. The list holding the units is not counted
+
+Usage (from the project root):
+    python -m benchmarks.unit_memory [--count N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import custom
+from enemy import SimpleEnemy
+from level import AbstractLevel
+from tower import Missile, Pulse
+
+CELL_SIZE = 60
+
+
+def make_enemies(enemy_class):
+    """Returns a function that creates 'count' enemies of 'enemy_class' in a single sub-wave"""
+
+    def make(count):
+        enemies = [enemy for _, enemy in AbstractLevel.generate_sub_waves([(count, count, enemy_class, (), {})])]
+        for enemy in enemies:
+            enemy.set_cell_size(CELL_SIZE)
+        return enemies
+
+    return make
+
+
+def make_missiles(count):
+    """Returns 'count' missiles, each with its own target"""
+    target = SimpleEnemy()
+    return [Missile((0, 0), CELL_SIZE, target, damage=150, grid_speed=.3) for _ in range(count)]
+
+
+def make_pulses(count):
+    """Returns 'count' pulses, in each direction in turn"""
+    directions = Pulse.DIRECTIONS
+    return [Pulse((0, 0), CELL_SIZE, directions[i % len(directions)]) for i in range(count)]
+
+
+UNITS = (
+    ("SimpleEnemy", make_enemies(SimpleEnemy)),
+    ("CustomEnemy", make_enemies(custom.CustomEnemy)),
+    ("AdvancedEnemy", make_enemies(custom.AdvancedEnemy)),
+    ("Missile", make_missiles),
+    ("Pulse", make_pulses),
+)
+
+
+def main(argv=None):
+    """Runs the unit memory benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000, help="Number of each unit to create")
+    args = parser.parse_args(argv)
+
+    print("{:>14} | {:>10} {:>14} | {:>11}".format("unit", "total (MB)", "bytes / unit", "create (ms)"))
+
+    for name, make in UNITS:
+        start = time.perf_counter()
+        make(args.count)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        units = make(args.count)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # exclude the list of units itself
+        size -= units.__sizeof__()
+
+        print("{:>14} | {:>10.1f} {:>14.0f} | {:>11.1f}".format(
+            name, size / 1e6, size / len(units), elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Compact, array-encoded paths
+
+A CompactPath holds the same information as a path.Path, but in a single flat
+buffer over a rectangle of cells: a 32-bit distance followed by a one byte
+bitmask of best deltas (bit i set for AXIAL_DELTAS[i]) per cell. The buffer
+can be any writable bytes-like object, so a path can be encoded straight into
+(i.e.) multiprocessing shared memory & read by other processes without copying
+"""
+
+from array import array
+from collections.abc import MutableMapping
+
+from modules.matrix import AXIAL_DELTAS
+from path import Path
+
+# best deltas for every bitmask, as sets iterated in the same order as Path builds them
+DELTAS_BY_MASK = tuple(frozenset(delta for bit, delta in enumerate(AXIAL_DELTAS) if mask & (1 << bit))
+                       for mask in range(1 << len(AXIAL_DELTAS)))
+
+BITS_BY_DELTA = {delta: 1 << bit for bit, delta in enumerate(AXIAL_DELTAS)}
+
+# stored in place of a distance for cells not on the path
+UNREACHABLE = -1
+
+
+class _CellGrid(MutableMapping):
+    """A mapping from cells within a rectangle to values stored in a flat sequence
+
+    Cells whose stored value is 'empty' are treated as absent
+    """
+    empty = None
+
+    def __init__(self, bounds, values):
+        """Constructor
+
+        Parameters:
+            bounds (tuple<int, int, int, int>): The (left, top, width, height) of the rectangle of cells
+            values (sequence): The value of each cell, row by row
+        """
+        self._left, self._top, self._width, self._height = bounds
+        self._values = values
+
+    def _get_index(self, cell):
+        """(int) Returns the index of 'cell' in the sequence of values, else -1 if out of bounds"""
+        column = cell[0] - self._left
+        row = cell[1] - self._top
+        if 0 <= column < self._width and 0 <= row < self._height:
+            return row * self._width + column
+        return -1
+
+    def _decode(self, value):
+        """Returns the mapped value for a stored 'value'"""
+        return value
+
+    def _encode(self, value):
+        """Returns the value to store for a mapped 'value'"""
+        return value
+
+    def __contains__(self, cell):
+        index = self._get_index(cell)
+        return index >= 0 and self._values[index] != self.empty
+
+    def __getitem__(self, cell):
+        index = self._get_index(cell)
+        if index < 0 or self._values[index] == self.empty:
+            raise KeyError(cell)
+        return self._decode(self._values[index])
+
+    def __setitem__(self, cell, value):
+        index = self._get_index(cell)
+        if index < 0:
+            raise KeyError(f"{cell} is outside of {self._left, self._top, self._width, self._height}")
+        self._values[index] = self._encode(value)
+
+    def __delitem__(self, cell):
+        if cell not in self:
+            raise KeyError(cell)
+        self._values[self._get_index(cell)] = self.empty
+
+    def __iter__(self):
+        empty = self.empty
+        for index, value in enumerate(self._values):
+            if value != empty:
+                row, column = divmod(index, self._width)
+                yield column + self._left, row + self._top
+
+    def __len__(self):
+        return len(self._values) - self._values.tolist().count(self.empty)
+
+
+class DeltaGrid(_CellGrid):
+    """The best deltas of each cell on a path, stored as a one byte bitmask per cell
+
+    Behaves as Path.deltas (a dict of cells to sets of deltas), except that the sets
+    it gives are frozen
+    """
+    empty = 0
+
+    def _decode(self, value):
+        return DELTAS_BY_MASK[value]
+
+    def _encode(self, value):
+        mask = 0
+        for delta in value:
+            mask |= BITS_BY_DELTA[delta]
+        return mask
+
+    def get_mask(self, cell):
+        """(int) Returns the bitmask of best deltas of 'cell', else 0 if it is not on the path"""
+        index = self._get_index(cell)
+        return self._values[index] if index >= 0 else 0
+
+
+class DistanceGrid(_CellGrid):
+    """The distance from each cell on a path to its end, stored as a 32-bit integer per cell"""
+    empty = UNREACHABLE
+
+
+class CompactPath(Path):
+    """A path from a start point to an end point, encoded into a single flat buffer
+
+    Reads (get_best_delta, get_best_path, membership, etc.) come straight from the buffer,
+    as do repairs (block & unblock), provided every cell reached stays within bounds
+    """
+
+    def __init__(self, start, end, bounds, buffer, get_neighbours=None):
+        """Wraps an already encoded path (see from_path), without copying it
+
+        Parameters:
+            start (tuple<int, int>): The starting position
+            end (tuple<int, int>): The end position
+            bounds (tuple<int, int, int, int>): The (left, top, width, height) of the
+                                                rectangle of cells encoded
+            buffer (bytes-like): The encoded path, of (at least) get_buffer_size(bounds) bytes
+            get_neighbours (func<tuple<int, int>>): A function which takes a position and
+                                                    returns the neighbours, if the path is to
+                                                    be repaired or searched for separators
+        """
+        self.start = start
+        self.end = end
+        self.get_neighbours = get_neighbours
+
+        self._bounds = bounds
+        self._buffer = memoryview(buffer).cast('B')
+
+        count = bounds[2] * bounds[3]
+        self.distances = DistanceGrid(bounds, self._buffer[:4 * count].cast('i'))
+        self.deltas = DeltaGrid(bounds, self._buffer[4 * count:5 * count])
+
+        self._best_cells = [cell for cell, _ in self.get_best_path()]
+
+    @staticmethod
+    def get_buffer_size(bounds):
+        """(int) Returns the number of bytes needed to encode a path over 'bounds'"""
+        return 5 * bounds[2] * bounds[3]
+
+    @staticmethod
+    def get_bounds(path):
+        """(tuple<int, int, int, int>) Returns the smallest (left, top, width, height)
+        rectangle containing every cell of 'path'"""
+        columns, rows = zip(*path.distances)
+        return min(columns), min(rows), max(columns) - min(columns) + 1, max(rows) - min(rows) + 1
+
+    @classmethod
+    def from_path(cls, path, bounds=None, buffer=None):
+        """(CompactPath) Encodes 'path' into a buffer
+
+        Parameters:
+            path (Path): The path to encode
+            bounds (tuple<int, int, int, int>): The (left, top, width, height) of the
+                                                rectangle of cells to encode, which must contain
+                                                every cell of path, else None for the smallest
+            buffer (bytes-like): The writable buffer to encode into (i.e. shared memory),
+                                 else None to allocate one
+        """
+        if bounds is None:
+            bounds = cls.get_bounds(path)
+
+        size = cls.get_buffer_size(bounds)
+        if buffer is None:
+            buffer = bytearray(size)
+        else:
+            buffer = memoryview(buffer).cast('B')[:size]
+
+        count = bounds[2] * bounds[3]
+        distances = memoryview(buffer)[:4 * count].cast('i')
+        distances[:] = array('i', [UNREACHABLE]) * count
+        buffer[4 * count:5 * count] = bytes(count)
+
+        distance_grid = DistanceGrid(bounds, distances)
+        delta_grid = DeltaGrid(bounds, memoryview(buffer)[4 * count:5 * count])
+
+        for cell, distance in path.distances.items():
+            distance_grid[cell] = distance
+        for cell, deltas in path.deltas.items():
+            delta_grid[cell] = deltas
+
+        return cls(path.start, path.end, bounds, buffer, path.get_neighbours)
+
+    def get_buffer(self):
+        """(memoryview) Returns the buffer this path is encoded in"""
+        return self._buffer
+
+    def get_layout(self):
+        """Returns the arguments, besides the buffer, needed to read this path's buffer
+        (i.e. in another process): CompactPath(*path.get_layout(), buffer)
+
+        Return:
+            tuple<tuple<int, int>, tuple<int, int>, tuple<int, int, int, int>>: (start, end, bounds)
+        """
+        return self.start, self.end, self._bounds
+
+    def copy(self):
+        """(CompactPath) Returns a copy of this path, which can be repaired independently of it"""
+        path = type(self)(self.start, self.end, self._bounds, bytearray(self._buffer), self.get_neighbours)
+        path._best_cells = list(self._best_cells)
+        return path
+
+    def __reduce__(self):
+        # neighbour functions are generally closures, so can't be pickled
+        return type(self), (self.start, self.end, self._bounds, bytearray(self._buffer))
+
+    def get_sources(self, destination):
+        """Yields the cell(s) that flow into destination
+
+        Parameters:
+            destination (tuple<int, int>): The destination cell
+        """
+        x, y = destination
+
+        for (dx, dy), bit in BITS_BY_DELTA.items():
+            source = x - dx, y - dy
+            if self.deltas.get_mask(source) & bit:
+                yield source
@@ -3,14 +3,51 @@
 import math
 from abc import ABC
 
+# The range radius (in cells) assumed when sizing buckets for tower queries,
+# i.e. that of a SimpleTower
+TYPICAL_RANGE = 1.5
+
 __author__ = "Benjamin Martin"
 __copyright__ = "Copyright 2018, The University of Queensland"
 __license__ = "MIT"
 __version__ = "1.1.0"
 
 
+# sizes & speeds scaled to a cell size, keyed by (value, cell size), so that units scaling
+# equal values share a single object rather than each holding a copy (see scale_to_cell)
+_SCALED = {}
+
+
+def scale_to_cell(value, cell_size):
+    """Returns 'value' (a number, or tuple of numbers, relative to a cell) scaled to pixels,
+    as an object shared by every unit scaling an equal value by the same cell size
+
+    Parameters:
+        value (int | float | tuple<int | float, ...>): The relative value
+        cell_size (int): The length of each cell, in pixels
+    """
+    key = value, cell_size
+    scaled = _SCALED.get(key)
+
+    if scaled is None:
+        if isinstance(value, tuple):
+            scaled = tuple(i * cell_size for i in value)
+        else:
+            scaled = value * cell_size
+        _SCALED[key] = scaled
+
+    return scaled
+
+
 class Unit(ABC):
-    """A basic unit on the game field"""
+    """A basic unit on the game field
+
+    Units are created in large numbers (i.e. every enemy of a wave), so define __slots__ rather
+    than a per-instance dict, and share their sizes & speeds (see scale_to_cell). Subclasses
+    should also define __slots__ (if only empty), unless they need to set attributes freely
+    """
+    __slots__ = ['position', 'grid_size', 'cell_size', 'size']
+
     name: str
     colour: str
 
@@ -22,13 +59,11 @@ class Unit(ABC):
         self.position = position
         self.grid_size = grid_size
 
-        self.cell_size = None
-        self.size = None
         self.set_cell_size(cell_size)
 
     def set_cell_size(self, cell_size: int):
         """Sets the cell size for this unit to 'cell_size'"""
-        self.size = tuple(i * cell_size for i in self.grid_size)
+        self.size = scale_to_cell(self.grid_size, cell_size)
         self.cell_size = cell_size
 
     def move_by(self, delta):
@@ -137,18 +172,57 @@ class BucketManager:
     """Collection of values mapped from two dimensional positions in a grid, the grid
     divided into multiple buckets (sub-regions)"""
 
+    # Incremented each time the buckets are laid out afresh (see _set_layout)
+    layout_version = 0
+
     def __init__(self, max_position, buckets=(10, 10)):
         bucket_size = tuple(int(i / buckets_i + .5) for i, buckets_i in zip(max_position, buckets))
 
         self._max = max_position
+
+        # map of each value to the index of the bucket it is in
+        self._indices = {}
+        self._occupied = 0  # the number of non-empty buckets
+
+        self._set_layout(buckets, bucket_size)
+
+    def _set_layout(self, buckets, bucket_size):
+        """Replaces all buckets with an empty 'buckets' grid of buckets, each 'bucket_size' large
+
+        Parameters:
+            buckets (tuple<int, int>): The number of (column, row) buckets
+            bucket_size (tuple<int, int>): The (width, height) of each bucket
+        """
         self._buckets = [[set() for i in range(buckets[1])] for i in range(buckets[0])]
         self._bucket_size = bucket_size
+        self._indices.clear()
+        self._occupied = 0
+        self.layout_version += 1
+
+    def get_bucket_size(self):
+        """(tuple<int, int>) Returns the (width, height) of each bucket"""
+        return self._bucket_size
+
+    def get_average_occupancy(self):
+        """(float) Returns the average number of values in each non-empty bucket"""
+        if self._occupied == 0:
+            return 0.
+        return len(self._indices) / self._occupied
+
+    def __len__(self):
+        """(int) Returns the number of values in this manager"""
+        return len(self._indices)
+
+    def __contains__(self, value):
+        """(bool) Returns True iff 'value' is in this manager"""
+        return value in self._indices
 
     def clear(self):
         """Removes all value & position mappings"""
-        for column in self._buckets:
-            for cell in column:
-                cell.clear()
+        for x_i, y_i in set(self._indices.values()):
+            self._buckets[x_i][y_i].clear()
+        self._indices.clear()
+        self._occupied = 0
 
     def position_to_index(self, position):
         """(tuple<int, int>) Returns index of the bucket that corresponds to position
@@ -160,13 +234,69 @@ class BucketManager:
 
     def add(self, position, value):
         """(tuple<int, int>) Adds 'value' at 'position'
+
+        If 'value' is already in this manager, it is moved to 'position'
         
         Parameters:
             position (tuple<int, int>): The position in the grid
             value (*): The value to add
         """
-        x_i, y_i = self.position_to_index(position)
-        self._buckets[x_i][y_i].add(value)
+        self._move(value, self.position_to_index(position))
+
+    def _move(self, value, index):
+        """Moves 'value' into the bucket at 'index', only touching buckets if its index has changed"""
+        old_index = self._indices.get(value)
+
+        if old_index == index:
+            return
+
+        x_i, y_i = index
+        bucket = self._buckets[x_i][y_i]
+        if not bucket:
+            self._occupied += 1
+        bucket.add(value)
+
+        if old_index is not None:
+            self._discard(value, old_index)
+
+        self._indices[value] = index
+
+    def _discard(self, value, index):
+        """Discards 'value' from the bucket at 'index'"""
+        x_i, y_i = index
+        bucket = self._buckets[x_i][y_i]
+        bucket.discard(value)
+        if not bucket:
+            self._occupied -= 1
+
+    def remove(self, value):
+        """Removes 'value', if it is in this manager
+
+        Parameters:
+            value (*): The value to remove
+        """
+        index = self._indices.pop(value, None)
+        if index is not None:
+            self._discard(value, index)
+
+    def is_position_in_bounds(self, position):
+        """(bool) Returns True iff 'position' is within the area this manager covers (i.e. the grid)
+
+        Parameters:
+            position (tuple<int, int>): The position in the grid
+        """
+        x, y = position
+        max_x, max_y = self._max
+        return 0 <= x < max_x and 0 <= y < max_y
+
+    def is_occupied(self, index):
+        """(bool) Returns True iff the bucket at 'index' holds any values
+
+        Parameters:
+            index (tuple<int, int>): The (column, row) index of the bucket
+        """
+        x_i, y_i = index
+        return bool(self._buckets[x_i][y_i])
 
     def get_bucket_for_position(self, position):
         """(tuple<int, int>) Returns the bucket corresponding to 'position'
@@ -177,7 +307,63 @@ class BucketManager:
         x_i, y_i = self.position_to_index(position)
         return self._buckets[x_i][y_i]
 
-        # def get_nearby_buckets(self):
+    def get_nearby_indices(self, position, nearby_buckets=None, bounds=None):
+        """Yields bucket indices in square rings of increasing distance around the bucket containing 'position'
+
+        Positions outside the grid (or 'bounds') start from the nearest bucket on its edge.
+
+        Parameters:
+            position (tuple<int, int>): The position in the grid
+            nearby_buckets (int): The maximum ring to search outward to (0 for just the bucket
+                                  containing 'position'), else None to search every bucket
+            bounds (tuple<tuple<num, num>, tuple<num, num>>): If not None, only buckets overlapping
+                                                               this ((left, top), (right, bottom))
+                                                               rectangle are yielded
+
+        Yield:
+            tuple<int, int>: The (column, row) index of each bucket
+        """
+        min_x, min_y = 0, 0
+        max_x, max_y = len(self._buckets) - 1, len(self._buckets[0]) - 1
+
+        if bounds is not None:
+            top_left, bottom_right = bounds
+            left, top = self.position_to_index(top_left)
+            right, bottom = self.position_to_index(bottom_right)
+
+            min_x, max_x = max(min_x, left), min(max_x, right)
+            min_y, max_y = max(min_y, top), min(max_y, bottom)
+
+            if min_x > max_x or min_y > max_y:
+                return
+
+        x_i, y_i = self.position_to_index(position)
+        x_i = min(max(x_i, min_x), max_x)
+        y_i = min(max(y_i, min_y), max_y)
+
+        max_ring = max(x_i - min_x, max_x - x_i, y_i - min_y, max_y - y_i)
+        if nearby_buckets is not None:
+            max_ring = min(max_ring, nearby_buckets)
+
+        yield x_i, y_i
+
+        for ring in range(1, max_ring + 1):
+            left, right = x_i - ring, x_i + ring
+            top, bottom = y_i - ring, y_i + ring
+
+            # top & bottom edges of the ring, including corners
+            for column in range(max(left, min_x), min(right, max_x) + 1):
+                if top >= min_y:
+                    yield column, top
+                if bottom <= max_y:
+                    yield column, bottom
+
+            # left & right edges of the ring, excluding corners
+            for row in range(max(top + 1, min_y), min(bottom - 1, max_y) + 1):
+                if left >= min_x:
+                    yield left, row
+                if right <= max_x:
+                    yield right, row
 
     def get_closish(self, position, nearby_buckets=None):
         """Yields positions, roughly prioritised by proximity to 'position'"""
@@ -192,19 +378,104 @@ class UnitManager(BucketManager):
         """Adds 'unit' to this UnitManager"""
         self.add(unit.position, unit)
 
-    def get_closish(self, position, nearby_buckets=None):
-        """Yields positions, roughly prioritised by proximity to 'position'"""
-        # naive implementation, performance could be improved by searching outwards from nearby buckets
+    def update_unit(self, unit: Unit):
+        """Moves 'unit' to the bucket for its current position, adding it if necessary
+
+        Units positioned outside of the grid are removed, as they can not be bucketed.
+        """
+        if self.is_position_in_bounds(unit.position):
+            x, y = unit.position
+            width, height = self._bucket_size
+            self._move(unit, (int(x // width), int(y // height)))
+        else:
+            self.remove(unit)
+
+    def remove_unit(self, unit: Unit):
+        """Removes 'unit' from this UnitManager, if present"""
+        self.remove(unit)
+
+    def get_closish(self, position, nearby_buckets=None, bounds=None):
+        """Yields units, roughly prioritised by proximity to 'position'
+
+        Buckets are searched in rings outward from the bucket containing 'position', so
+        consumers that stop early (i.e. after the first match) only visit nearby buckets.
+
+        Parameters:
+            position (tuple<int, int>): The position to search outward from
+            nearby_buckets (int): The maximum ring of buckets to search (see get_nearby_indices),
+                                  else None to search every bucket
+            bounds (tuple<tuple<num, num>, tuple<num, num>>): If not None, only buckets overlapping
+                                                               this ((left, top), (right, bottom))
+                                                               rectangle are searched
+        """
+        for x_i, y_i in self.get_nearby_indices(position, nearby_buckets, bounds):
+            yield from self._buckets[x_i][y_i]
+
+    def get_units_in_box(self, top_left, bottom_right):
+        """Yields units in every bucket overlapping a rectangle
+
+        Note: Units are only filtered by bucket, so may lie outside the rectangle itself
+
+        Parameters:
+            top_left (tuple<num, num>): The top-left corner of the rectangle
+            bottom_right (tuple<num, num>): The bottom-right corner of the rectangle
+        """
+        yield from self.get_closish(top_left, bounds=(top_left, bottom_right))
+
+
+class AdaptiveUnitManager(UnitManager):
+    """UnitManager which sizes its buckets from the grid's cell size & typical query range,
+    and rebalances (halving or doubling bucket sizes) as units crowd together or spread out"""
+
+    def __init__(self, max_position, cell_size, unit_range=TYPICAL_RANGE,
+                 max_occupancy=16, min_occupancy=2):
+        """Constructor
+
+        Parameters:
+            max_position (tuple<int, int>): The (width, height) of the grid, in pixels
+            cell_size (int): The side length of a grid cell, in pixels
+            unit_range (float): The typical radius of queries (i.e. tower ranges), in cells
+            max_occupancy (float): Buckets are shrunk when the average number of units
+                                   per non-empty bucket exceeds this
+            min_occupancy (float): Buckets are grown (back toward their initial size) when
+                                   the average number of units per non-empty bucket drops below this
+        """
+        # a bucket the size of the range radius keeps most range queries within a 3x3 block of buckets
+        self._initial_size = max(1, int(cell_size * unit_range))
+        self._min_size = max(1, cell_size // 4)
+
+        self._max_occupancy = max_occupancy
+        self._min_occupancy = min_occupancy
+
+        super().__init__(max_position)
+        self.resize(self._initial_size)
+
+    def resize(self, size):
+        """Re-buckets all units into square buckets of side length 'size' (pixels)
+
+        The last row & column of buckets may overhang the grid, so that every position has a bucket
+        """
+        units = list(self._indices)
+        buckets = tuple(max(1, -(-i // size)) for i in self._max)
+        self._set_layout(buckets, (size, size))
+
+        for unit in units:
+            self.update_unit(unit)
 
-        # if nearby_buckets is None:
-        #     nearby_buckets = {(0, 0)}
+    def rebalance(self):
+        """(bool) Resizes buckets if their average occupancy has drifted past a threshold,
+        returning True iff the buckets were resized"""
+        size = self._bucket_size[0]
+        occupancy = self.get_average_occupancy()
 
-        # x_i, y_i = self.position_to_index(position)
+        if occupancy > self._max_occupancy and size > self._min_size:
+            self.resize(max(self._min_size, size // 2))
+        elif 0 < occupancy < self._min_occupancy and size < self._initial_size:
+            self.resize(min(self._initial_size, size * 2))
+        else:
+            return False
 
-        for column in self._buckets:
-            for values in column:
-                for value in values:
-                    yield value
+        return True
 
 
 class GameData:
@@ -212,7 +483,11 @@ class GameData:
     modelling class directly"""
 
     enemies = None
+    enemy_store = None
     obstacles = None
     towers = None
     grid = None
     path = None
+    flow_field = None
+    projectile_pool = None
+    polyline = None
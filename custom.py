@@ -1,13 +1,14 @@
 from enemy import SimpleEnemy
 from range_ import CircularRange
-from utilities import rectangles_intersect, get_delta_through_centre, \
-    angle_between, rotate_toward
+from utilities import angle_between, rotate_toward
 from tower import SimpleTower
 import math
 
 
 class CustomEnemy(SimpleEnemy):
     """custom type(energy) of enemy"""
+    __slots__ = []
+
     name = "Energy Enemy"
     colour = 'ORANGE'
 
@@ -51,18 +52,17 @@ class CustomTower(SimpleTower):
         """Rotates toward 'target' and attacks if possible"""
         self.cool_down.step()
 
-        target = self.get_unit_in_range(data.enemies)
+        target = self.get_target(data)
 
         if target is None:
+            self.idle_steps = math.inf
             return
 
+        self.idle_steps = 0
+
         # check if the enemy is custom enemy.
-        for enemy in self.get_units_in_range(data.enemies):
-            if not enemy.name == "Energy Enemy":
-                return
-            else:
-                target = enemy
-                break
+        if not target.name == "Energy Enemy":
+            return
 
         angle = angle_between(self.position, target.position)
         partial_angle = rotate_toward(self.rotation, angle,
@@ -95,11 +95,15 @@ class AdvancedTower(SimpleTower):
         """Rotates toward 'target' and slow down it if possible"""
         self.cool_down.step()
 
-        target = self.get_unit_in_range(data.enemies)
+        target = self.get_target(data)
 
         if target is None:
+            self.idle_steps = math.inf
             return
 
+        # rotates toward target even while cooling down, so can't idle
+        self.idle_steps = 0
+
         angle = angle_between(self.position, target.position)
         partial_angle = rotate_toward(self.rotation, angle,
                                       self.rotation_threshold)
@@ -125,8 +129,13 @@ class AdvancedEnemy(SimpleEnemy):
 
     def __init__(self, grid_size=(.2, .2), grid_speed=5 / 60, health=200,
                  stage=2):
-        super().__init__(grid_size, grid_speed, health)
         self._stage = stage
+        super().__init__(grid_size, grid_speed, health)
+
+    def set_cell_size(self, cell_size: int):
+        """Sets the cell size for this unit to 'cell_size'"""
+        super().set_cell_size(cell_size)
+        self._change_stage()
 
     def _change_stage(self):
         """Control the different stage of enemy"""
@@ -156,47 +165,5 @@ class AdvancedEnemy(SimpleEnemy):
         elif self._stage == 0 and self.health < 0:
             self.health = 0
 
-    def step(self, data):
-        """Move the enemy forward a single time-step
-
-        Parameters:
-            grid (GridCoordinateTranslator): Grid the enemy is currently on
-            path (Path): The path the enemy is following
-
-        Returns:
-            bool: True iff the new location of the enemy is within the grid
-        """
-        grid = data.grid
-        path = data.path
-
         # Update stages
         self._change_stage()
-
-        # Repeatedly move toward next cell centre as much as possible
-        movement = self.grid_speed
-        while movement > 0:
-            cell_offset = grid.pixel_to_cell_offset(self.position)
-
-            # Assuming cell_offset is along an axis!
-            offset_length = abs(cell_offset[0] + cell_offset[1])
-
-            if offset_length == 0:
-                partial_movement = movement
-            else:
-                partial_movement = min(offset_length, movement)
-
-            cell_position = grid.pixel_to_cell(self.position)
-            delta = path.get_best_delta(cell_position)
-
-            # Ensures enemy will move to the centre before moving toward delta
-            dx, dy = get_delta_through_centre(cell_offset, delta)
-
-            speed = partial_movement * self.cell_size
-            self.move_by((speed * dx, speed * dy))
-            self.position = tuple(int(i) for i in self.position)
-
-            movement -= partial_movement
-
-        intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0),
-                                          grid.pixels)
-        return intersects or grid.pixel_to_cell(self.position) in path.deltas
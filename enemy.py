@@ -3,7 +3,7 @@
 All enemies should inherit from AbstractEnemy (either directly or from one of its subclasses)
 """
 
-from core import Unit
+from core import Unit, scale_to_cell
 from utilities import rectangles_intersect, get_delta_through_centre
 
 __author__ = "Benjamin Martin and Brae Webb"
@@ -14,7 +14,7 @@ __version__ = "1.1.0"
 
 class AbstractEnemy(Unit):
     """An enemy for the towers to defend against"""
-    speed = None
+    __slots__ = ['grid_speed', 'speed', 'health', 'max_health']
 
     # Must be overridden/implemented!
     name: str
@@ -39,7 +39,7 @@ class AbstractEnemy(Unit):
     def set_cell_size(self, cell_size: int):
         """Sets the cell size for this unit to 'cell_size'"""
         super().set_cell_size(cell_size)
-        self.speed = cell_size * self.grid_speed
+        self.speed = scale_to_cell(self.grid_speed, cell_size)
 
     def is_dead(self):
         """(bool) True iff the enemy is dead i.e. health below zero"""
@@ -58,6 +58,17 @@ class AbstractEnemy(Unit):
         """
         raise NotImplementedError("damage method must be implemented by subclass")
 
+    def get_distance_remaining(self, data):
+        """(float) Returns the distance (in cells) left for this enemy to travel along the path"""
+        grid = data.grid
+        return data.path.get_distance_remaining(grid.pixel_to_cell(self.position),
+                                                grid.pixel_to_cell_offset(self.position))
+
+    def get_travelled(self, polyline):
+        """(float) Returns the distance (in pixels) this enemy has travelled along 'polyline',
+        else None if it does not move by arc-length (see SimpleEnemy.step)"""
+        return None
+
 
 class SimpleEnemy(AbstractEnemy):
     """Basic type of enemy"""
@@ -66,9 +77,15 @@ class SimpleEnemy(AbstractEnemy):
 
     points = 5
 
+    # distance (in pixels) travelled along _polyline, when moving by arc-length (see step)
+    __slots__ = ['travelled', '_polyline']
+
     def __init__(self, grid_size=(.2, .2), grid_speed=5/60, health=100):
         super().__init__(grid_size, grid_speed, health)
 
+        self.travelled = None
+        self._polyline = None
+
     def damage(self, damage, type_):
         """Inflict damage on the enemy
 
@@ -80,18 +97,64 @@ class SimpleEnemy(AbstractEnemy):
         if self.health < 0:
             self.health = 0
 
+    def get_distance_remaining(self, data):
+        """(float) Returns the distance (in cells) left for this enemy to travel along the path"""
+        if self.travelled is not None and self._polyline is data.polyline:
+            return (self._polyline.length - self.travelled) / self._polyline.cell_size
+        return super().get_distance_remaining(data)
+
+    def get_travelled(self, polyline):
+        """(float) Returns the distance (in pixels) this enemy has travelled along 'polyline',
+        projecting its position onto polyline if it was following another, else None if it
+        is not on polyline"""
+        if self._polyline is not polyline:
+            self._polyline = polyline
+            self.travelled = polyline.project(self.position)
+
+        return self.travelled
+
     def step(self, data):
         """Move the enemy forward a single time-step
 
+        When moving by arc-length, the enemy keeps only its distance travelled along the
+        best path's polyline, which is found again (projected) only when the path changes.
+        An enemy left off the new best path moves cell by cell until it rejoins it, and an
+        enemy escapes on leaving the end cell
+
         Parameters:
             grid (GridCoordinateTranslator): Grid the enemy is currently on
             path (Path): The path the enemy is following
+            flow_field (FlowField): The path as a flow field, else None to follow path directly
+            polyline (Polyline): The path's best path in pixels, else None to move cell by cell
 
         Returns:
             bool: True iff the new location of the enemy is within the grid
         """
+        polyline = data.polyline
+        if polyline is None:
+            return self._step_through_cells(data)
+
+        if self.get_travelled(polyline) is None:
+            in_grid = self._step_through_cells(data)
+            self.travelled = polyline.project(self.position)
+            return in_grid
+
+        self.travelled += self.grid_speed * self.cell_size
+        self.position = polyline.get_position(self.travelled)
+
+        # escaped on leaving the end cell
+        return self.travelled < polyline.length + polyline.cell_size / 2
+
+    def _step_through_cells(self, data):
+        """Moves the enemy forward a single time-step, toward the centre of each cell then along
+        its best delta (see step)"""
         grid = data.grid
-        path = data.path
+
+        # cells on the path & the delta to take from each
+        if data.flow_field is None:
+            path_cells, get_delta = data.path.deltas, data.path.get_best_delta
+        else:
+            path_cells, get_delta = data.flow_field, data.flow_field.get_delta
 
         # Repeatedly move toward next cell centre as much as possible
         movement = self.grid_speed
@@ -107,7 +170,7 @@ class SimpleEnemy(AbstractEnemy):
                 partial_movement = min(offset_length, movement)
 
             cell_position = grid.pixel_to_cell(self.position)
-            delta = path.get_best_delta(cell_position)
+            delta = get_delta(cell_position)
 
             # Ensures enemy will move to the centre before moving toward delta
             dx, dy = get_delta_through_centre(cell_offset, delta)
@@ -119,11 +182,13 @@ class SimpleEnemy(AbstractEnemy):
             movement -= partial_movement
 
         intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0), grid.pixels)
-        return intersects or grid.pixel_to_cell(self.position) in path.deltas
+        return intersects or grid.pixel_to_cell(self.position) in path_cells
 
 
 class InvincibleEnemy(SimpleEnemy):
     """An enemy that cannot be killed; not useful, just a proof of concept"""
+    __slots__ = []
+
     name = "Invincible Enemy"
     colour = '#4D4C5B'  # Porpoise
 
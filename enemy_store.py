@@ -0,0 +1,407 @@
+"""
+Array-backed (struct-of-arrays) store of enemy state, for vectorised queries
+
+Requires numpy, unlike the rest of the simulation core, so is only imported
+when a TowerGame is constructed with enemy_store=True
+"""
+
+from collections import deque
+from itertools import repeat
+
+import numpy as np
+
+
+class EnemyStore:
+    """Contiguous arrays of enemy state, kept in the same order as a list of enemies
+
+    Attributes:
+        enemies (list<AbstractEnemy>): The enemies, in the same order as every array
+        x (array<float>): The x pixel position of each enemy
+        y (array<float>): The y pixel position of each enemy
+        health (array<float>): The health of each enemy
+        speed (array<float>): The speed of each enemy, in pixels per step
+        type (array<int>): The code of each enemy's class (see get_type)
+        valid (array<bool>): True for each enemy positioned within the grid
+        travelled (array<float>): The distance (in pixels) each enemy has travelled along the
+                                  polyline last advanced along (see advance), else nan
+    """
+    # The maximum number of (tower, enemy) pairs to test in a single array operation
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, max_position):
+        """Constructor
+
+        Parameters:
+            max_position (tuple<int, int>): The (width, height) of the grid, in pixels
+        """
+        self._max = max_position
+
+        self._type_codes = {}
+        self._types = []
+
+        self.sync(())
+
+    def __len__(self):
+        """(int) Returns the number of enemies in this store"""
+        return len(self.enemies)
+
+    def get_type_code(self, enemy_class):
+        """(int) Returns the code used for 'enemy_class' in the type array"""
+        code = self._type_codes.get(enemy_class)
+        if code is None:
+            code = self._type_codes[enemy_class] = len(self._types)
+            self._types.append(enemy_class)
+        return code
+
+    def get_type(self, code):
+        """(Class<AbstractEnemy>) Returns the enemy class corresponding to 'code' in the type array"""
+        return self._types[code]
+
+    def sync(self, enemies):
+        """Replaces the contents of this store with the current state of 'enemies'
+
+        Parameters:
+            enemies (iter<AbstractEnemy>): The positioned enemies to store
+        """
+        self.enemies = enemies = list(enemies)
+        self.x, self.y, self.health, self.speed, self.type = self._gather(enemies)
+        self.travelled = np.full(len(enemies), np.nan)
+        self._polyline = None
+
+        self._update_valid()
+
+    def extend(self, enemies):
+        """Adds the current state of 'enemies' to the end of this store
+
+        Parameters:
+            enemies (iter<AbstractEnemy>): The positioned enemies to add
+        """
+        enemies = list(enemies)
+        if not enemies:
+            return
+
+        self.enemies.extend(enemies)
+        arrays = (self.x, self.y, self.health, self.speed, self.type)
+        self.x, self.y, self.health, self.speed, self.type = (np.concatenate((old, new)) for old, new
+                                                              in zip(arrays, self._gather(enemies)))
+
+        if self._polyline is None:
+            travelled = np.full(len(enemies), np.nan)
+        else:
+            travelled = np.array([enemy.get_travelled(self._polyline) for enemy in enemies], dtype=float)
+        self.travelled = np.concatenate((self.travelled, travelled))
+
+        self._update_valid()
+
+    def _gather(self, enemies):
+        """Returns the (x, y, health, speed, type) arrays of a list of enemies"""
+        count = len(enemies)
+
+        positions = np.array([enemy.position for enemy in enemies], dtype=float).reshape(count, 2)
+        health = np.fromiter((enemy.health for enemy in enemies), float, count)
+        speed = np.fromiter((enemy.grid_speed * enemy.cell_size for enemy in enemies), float, count)
+
+        get_type_code = self.get_type_code
+        types = np.fromiter((get_type_code(type(enemy)) for enemy in enemies), np.int16, count)
+
+        return positions[:, 0].copy(), positions[:, 1].copy(), health, speed, types
+
+    def _update_valid(self):
+        """Marks which enemies are positioned within the grid"""
+        width, height = self._max
+        self.valid = (0 <= self.x) & (self.x < width) & (0 <= self.y) & (self.y < height)
+
+    def advance(self, polyline):
+        """Moves every live enemy travelling along 'polyline' a single time-step, as
+        SimpleEnemy.step does when moving by arc-length, in array operations
+
+        Health & speed are read afresh from every enemy (as towers damage & slow them between
+        steps), while distances travelled are read only when polyline changes. Each moved
+        enemy's position & distance travelled are written back to it
+
+        Parameters:
+            polyline (Polyline): The best path the enemies are following
+
+        Return:
+            tuple<list<int>, list<int>, list<int>>: The indices of the enemies that are dead,
+                                                    that escaped, & that are alive but not on
+                                                    polyline (so were not moved), in store order
+        """
+        enemies = self.enemies
+        self.health = np.fromiter((enemy.health for enemy in enemies), float, len(enemies))
+        self.speed = np.fromiter((enemy.grid_speed * enemy.cell_size for enemy in enemies), float, len(enemies))
+        dead = self.health <= 0
+
+        if polyline is not self._polyline:
+            self._polyline = polyline
+            self._points = np.array(polyline.points, dtype=float).reshape(-1, 2)
+            self._lengths = np.frombuffer(polyline.lengths)
+
+            # None (not on polyline) becomes nan
+            self.travelled = np.array([enemy.get_travelled(polyline) for enemy in enemies], dtype=float)
+
+        stranded = ~dead & np.isnan(self.travelled)
+        moving = np.flatnonzero(~dead & ~stranded)
+
+        travelled = self.travelled[moving] + self.speed[moving]
+        self.travelled[moving] = travelled
+
+        # clamped before start, but continuing in the direction of the last step beyond end
+        points, lengths = self._points, self._lengths
+        x = np.interp(travelled, lengths, points[:, 0])
+        y = np.interp(travelled, lengths, points[:, 1])
+        if len(points) > 1:
+            (x0, y0), (x1, y1) = points[-2:]
+            overshoot = np.maximum(travelled - polyline.length, 0) / (lengths[-1] - lengths[-2])
+            x += overshoot * (x1 - x0)
+            y += overshoot * (y1 - y0)
+
+        self.x[moving], self.y[moving] = x, y
+        self._update_valid()
+
+        # written back by map, rather than a loop, as this dominates the time taken for large waves
+        moved = enemies if len(moving) == len(enemies) else [enemies[i] for i in moving.tolist()]
+        deque(map(setattr, moved, repeat('travelled'), travelled.tolist()), 0)
+        deque(map(setattr, moved, repeat('position'), zip(x.tolist(), y.tolist())), 0)
+
+        escaped = moving[travelled >= polyline.length + polyline.cell_size / 2]
+
+        return np.flatnonzero(dead).tolist(), escaped.tolist(), np.flatnonzero(stranded).tolist()
+
+    def refresh(self, index):
+        """Reads the position & distance travelled of the enemy at 'index' again, after it has been moved"""
+        enemy = self.enemies[index]
+        self.x[index], self.y[index] = enemy.position
+        travelled = None if self._polyline is None else enemy.get_travelled(self._polyline)
+        self.travelled[index] = np.nan if travelled is None else travelled
+
+        width, height = self._max
+        self.valid[index] = 0 <= self.x[index] < width and 0 <= self.y[index] < height
+
+    def remove(self, indices):
+        """Removes the enemies at 'indices' from this store, keeping the rest in order"""
+        if not indices:
+            return
+
+        keep = np.ones(len(self.enemies), dtype=bool)
+        keep[indices] = False
+
+        self.enemies = [enemy for enemy, kept in zip(self.enemies, keep.tolist()) if kept]
+        for name in ('x', 'y', 'health', 'speed', 'type', 'valid', 'travelled'):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def get_indices_in_range(self, tower):
+        """(array<int>) Returns the indices of the enemies within the grid that are in-range of 'tower'"""
+        x, y = tower.position
+        cell_size = tower.cell_size
+
+        in_range = np.asarray(tower.range.contains_points((self.x - x) / cell_size, (self.y - y) / cell_size))
+        return np.flatnonzero(in_range & self.valid)
+
+    def get_enemies_in_range(self, tower):
+        """(list<AbstractEnemy>) Returns the enemies within the grid that are in-range of 'tower'"""
+        enemies = self.enemies
+        return [enemies[i] for i in self.get_indices_in_range(tower)]
+
+    def get_occupied_buckets(self, bucket_size):
+        """(set<tuple<int, int>>) Returns the (column, row) index of every bucket of 'bucket_size'
+        holding an enemy within the grid, as a BucketManager would index it"""
+        width, height = bucket_size
+        columns = (self.x[self.valid] // width).astype(np.int64)
+        rows = (self.y[self.valid] // height).astype(np.int64)
+
+        stride = int(self._max[1] // height) + 1
+        keys = np.unique(columns * stride + rows)
+        return set(zip((keys // stride).tolist(), (keys % stride).tolist()))
+
+    def get_all_in_range(self, towers):
+        """Finds the enemies in-range of every tower at once
+
+        Enemies are sorted into vertical strips at least as wide as any tower's range box, and by
+        y position within each strip, so each tower's candidates are at most two contiguous runs of
+        enemies (found by binary search). Every (tower, candidate) pair of towers sharing a range
+        is then tested together in a single array operation
+
+        Parameters:
+            towers (iter<AbstractTower>): The towers to query for
+
+        Return:
+            dict<AbstractTower: list<AbstractEnemy>>: The enemies within the grid that are
+                                                      in-range of each tower, in store order
+        """
+        towers = list(towers)
+        boxes = [tower.get_range_box() for tower in towers]
+        if any(box is None for box in boxes):
+            return {tower: self.get_enemies_in_range(tower) for tower in towers}
+
+        strip = max([right - left for (left, _), (right, _) in boxes] + [1])
+        order, keys = self._sort_by_strip(strip)
+
+        enemies = self.enemies
+
+        # group towers by (shared) range instance
+        groups = {}
+        for tower, box in zip(towers, boxes):
+            _, group, group_boxes = groups.setdefault(id(tower.range), (tower.range, [], []))
+            group.append(tower)
+            group_boxes.append(box)
+
+        results = {}
+        for range_, group, group_boxes in groups.values():
+            tower_x = np.array([tower.position[0] for tower in group], dtype=float)
+            tower_y = np.array([tower.position[1] for tower in group], dtype=float)
+            cell_size = np.array([tower.cell_size for tower in group], dtype=float)
+            (left, top), (right, bottom) = np.array(group_boxes, dtype=float).transpose(1, 2, 0)
+            low, high = self._get_runs(keys, strip, left, top, right, bottom)
+
+            for chunk in self._chunk((high - low).sum(axis=1)):
+                # each tower's (up to) two runs are adjacent, so run i belongs to tower i // 2
+                run_i, enemy_i = self._get_pairs(order, low[chunk].ravel(), high[chunk].ravel())
+                tower_i = run_i // 2 + chunk.start
+
+                dx = (self.x[enemy_i] - tower_x[tower_i]) / cell_size[tower_i]
+                dy = (self.y[enemy_i] - tower_y[tower_i]) / cell_size[tower_i]
+                hit = np.asarray(range_.contains_points(dx, dy), dtype=bool)
+                tower_i, enemy_i = tower_i[hit], enemy_i[hit]
+
+                # group hits by tower, each in store order
+                by_tower = np.lexsort((enemy_i, tower_i))
+                tower_i, enemy_i = tower_i[by_tower], enemy_i[by_tower]
+                splits = np.searchsorted(tower_i, np.arange(chunk.start, chunk.stop + 1))
+
+                for i, tower in enumerate(group[chunk]):
+                    results[tower] = [enemies[j] for j in enemy_i[splits[i]:splits[i + 1]].tolist()]
+
+        return results
+
+    def get_all_in_boxes(self, boxes, bucket_size=None):
+        """Finds the enemies whose bounding boxes intersect each of 'boxes' at once, as
+        rectangles_intersect would (i.e. boxes that only touch intersect)
+
+        Each box is expanded by the largest enemy's size, so that every enemy that could
+        intersect it is within at most two runs of enemies sorted into strips (see get_all_in_range),
+        then every (box, candidate) pair is tested together in a single array operation
+
+        Parameters:
+            boxes (list<tuple<tuple<num, num>, tuple<num, num>>>): The ((left, top), (right, bottom))
+                                                                    boxes to query for
+            bucket_size (tuple<int, int>): If not None, only enemies in buckets of this size that
+                                           overlap a box are found for it, as searching a
+                                           BucketManager's buckets would (see Pulse.step)
+
+        Return:
+            list<list<AbstractEnemy>>: The enemies within the grid that intersect each box, in store order
+        """
+        enemies = self.enemies
+        results = [[] for _ in boxes]
+        if not boxes or not enemies:
+            return results
+
+        # read afresh, as enemies can change size when damaged (i.e. AdvancedEnemy)
+        sizes = np.array([enemy.size for enemy in enemies], dtype=float).reshape(len(enemies), 2)
+        widths, heights = sizes[:, 0], sizes[:, 1]
+
+        # as Unit.get_bounding_box
+        enemy_left, enemy_top = self.x - widths // 2, self.y - heights // 2
+        enemy_right, enemy_bottom = enemy_left + widths, enemy_top + heights
+
+        (left, top), (right, bottom) = np.array(boxes, dtype=float).reshape(-1, 2, 2).transpose(1, 2, 0)
+        reach_x, reach_y = widths.max(), heights.max()
+
+        if bucket_size is not None:
+            bucket_width, bucket_height = bucket_size
+            columns, rows = self.x // bucket_width, self.y // bucket_height
+            first_columns, last_columns = left // bucket_width, right // bucket_width
+            first_rows, last_rows = top // bucket_height, bottom // bucket_height
+
+        strip = max(float((right - left).max()) + 2 * reach_x, 1)
+        order, keys = self._sort_by_strip(strip)
+        low, high = self._get_runs(keys, strip, left - reach_x, top - reach_y, right + reach_x, bottom + reach_y)
+
+        for chunk in self._chunk((high - low).sum(axis=1)):
+            # each box's (up to) two runs are adjacent, so run i belongs to box i // 2
+            run_i, enemy_i = self._get_pairs(order, low[chunk].ravel(), high[chunk].ravel())
+            box_i = run_i // 2 + chunk.start
+
+            hit = ~((left[box_i] > enemy_right[enemy_i]) | (right[box_i] < enemy_left[enemy_i]) |
+                    (top[box_i] > enemy_bottom[enemy_i]) | (bottom[box_i] < enemy_top[enemy_i]))
+            if bucket_size is not None:
+                hit &= (first_columns[box_i] <= columns[enemy_i]) & (columns[enemy_i] <= last_columns[box_i]) & \
+                    (first_rows[box_i] <= rows[enemy_i]) & (rows[enemy_i] <= last_rows[box_i])
+            box_i, enemy_i = box_i[hit], enemy_i[hit]
+
+            # group hits by box, each in store order
+            by_box = np.lexsort((enemy_i, box_i))
+            box_i, enemy_i = box_i[by_box], enemy_i[by_box]
+            splits = np.searchsorted(box_i, np.arange(chunk.start, chunk.stop + 1))
+
+            for i in range(chunk.stop - chunk.start):
+                results[chunk.start + i] = [enemies[j] for j in enemy_i[splits[i]:splits[i + 1]].tolist()]
+
+        return results
+
+    def _sort_by_strip(self, strip):
+        """Sorts the enemies within the grid into vertical strips 'strip' pixels wide, and by
+        y position within each strip, so the enemies within any box no wider than a strip are
+        at most two contiguous runs (see _get_runs)
+
+        Return:
+            tuple<array<int>, array<float>>: The store index & sort key of each enemy, in sorted order
+        """
+        stride = 2 * self._max[1]  # separates the keys of successive strips
+
+        indices = np.flatnonzero(self.valid)
+        keys = (self.x[indices] // strip) * stride + self.y[indices]
+        by_key = np.argsort(keys, kind='stable')
+        return indices[by_key], keys[by_key]
+
+    def _get_runs(self, keys, strip, left, top, right, bottom):
+        """Returns the bounds of the (up to) two runs of 'keys' (see _sort_by_strip) within each box
+
+        Parameters:
+            keys (array<float>): The sorted keys of the enemies, for strips 'strip' pixels wide
+            left, top, right, bottom (array<float>): The sides of each box, none wider than a strip
+
+        Return:
+            tuple<array<int>, array<int>>: The (n, 2) start & stop positions of each box's runs
+        """
+        height = self._max[1]
+        stride = 2 * height
+
+        # a box spans at most two strips, as no box is wider than a strip
+        first, last = left // strip, right // strip
+        top, bottom = np.clip(top, 0, height), np.clip(bottom, 0, height)
+
+        low = np.searchsorted(keys, np.stack((first * stride + top, (first + 1) * stride + top), axis=1), 'left')
+        high = np.searchsorted(keys, np.stack((first * stride + bottom, (first + 1) * stride + bottom), axis=1),
+                               'right')
+        high[last == first, 1] = low[last == first, 1]
+
+        return low, high
+
+    def _chunk(self, counts):
+        """Yields slices of consecutive towers whose total number of candidate enemies
+        (given by 'counts') does not exceed CHUNK_SIZE, unless a single tower's does"""
+        start = total = 0
+        for i, count in enumerate(counts.tolist()):
+            if total and total + count > self.CHUNK_SIZE:
+                yield slice(start, i)
+                start, total = i, 0
+            total += count
+        yield slice(start, len(counts))
+
+    @staticmethod
+    def _get_pairs(order, low, high):
+        """Returns every (run, enemy) pair of indices, where each run i is the enemies order[low[i]:high[i]]
+
+        Return:
+            tuple<array<int>, array<int>>: The run & enemy index of each pair
+        """
+        counts = high - low
+        run_i = np.repeat(np.arange(len(counts)), counts)
+
+        # offset of each pair within its run, plus the start of that run
+        firsts = np.cumsum(counts) - counts
+        positions = np.arange(counts.sum()) + np.repeat(low - firsts, counts)
+
+        return run_i, order[positions]
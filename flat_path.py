@@ -0,0 +1,123 @@
+"""
+Path-finding over a flat, integer-indexed grid
+
+Builds the same Path as path.Path, but searches over arrays indexed by cell
+number rather than calling a neighbours function (& building tuples) for
+every cell visited
+"""
+
+from array import array
+
+from modules.matrix import AXIAL_DELTAS
+from path import Path
+
+
+class FlatGridPath(Path):
+    """A path from a start point to an end point, through a rectangular grid of cells
+
+    The grid is padded with a border of impassable cells, which start & end may lie in,
+    so that every neighbour of a passable cell has an index in the flat grid
+    """
+
+    def __init__(self, start, end, get_neighbours, size, blocked):
+        """Initialize a path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>): The starting position
+            end (tuple<int, int>): The end position
+            get_neighbours (func<tuple<int, int>>): A function which takes a
+                                                    position and returns the
+                                                    neighbours (used when the
+                                                    path is repaired)
+            size (tuple<int, int>): The number of (column, row) cells in the grid
+            blocked (set<tuple<int, int>>): The cells within the grid that can't be passed through
+        """
+        self._size = size
+        self._blocked = blocked
+
+        super().__init__(start, end, get_neighbours)
+
+    def _generate_distance_map(self):
+        """Generate a mapping of positions to their distance from the end point
+
+        Also finds the best deltas of each position reached, as a bitmask of indices
+        into AXIAL_DELTAS, for _generate_best_neighbours
+
+        Returns:
+            dict<tuple<int, int>: int>: the position distance mapping
+        """
+        columns, rows = self._size
+        (start_column, start_row), (end_column, end_row) = self.start, self.end
+
+        # bounds of the grid, start & end, padded by an impassable border
+        left = min(0, start_column, end_column) - 1
+        top = min(0, start_row, end_row) - 1
+        width = max(columns, start_column + 1, end_column + 1) + 1 - left
+        height = max(rows, start_row + 1, end_row + 1) + 1 - top
+
+        passable = bytearray(width * height)
+        for row in range(rows):
+            offset = (row - top) * width - left
+            passable[offset:offset + columns] = b'\x01' * columns
+        for column, row in self._blocked:
+            if 0 <= column < columns and 0 <= row < rows:
+                passable[(row - top) * width + column - left] = 0
+
+        start = (start_row - top) * width + start_column - left
+        end = (end_row - top) * width + end_column - left
+        passable[start] = passable[end] = 1
+
+        offsets = [dy * width + dx for dx, dy in AXIAL_DELTAS]
+
+        # breadth-first search from the end, with order doubling as the queue
+        distance = array('i', [-1]) * (width * height)
+        distance[end] = 0
+        order = [end]
+
+        for index in order:
+            next_distance = distance[index] + 1
+            for offset in offsets:
+                neighbour = index + offset
+                if passable[neighbour] and distance[neighbour] < 0:
+                    distance[neighbour] = next_distance
+                    order.append(neighbour)
+
+        # bitmask of the neighbours closest to the end, in AXIAL_DELTAS order
+        self._best_masks = masks = []
+        for index in order:
+            best_distance = None
+            mask = 0
+            for bit, offset in enumerate(offsets):
+                neighbour = index + offset
+                if not passable[neighbour]:
+                    continue
+
+                neighbour_distance = distance[neighbour]
+                if best_distance is None or neighbour_distance < best_distance:
+                    best_distance, mask = neighbour_distance, 1 << bit
+                elif neighbour_distance == best_distance:
+                    mask |= 1 << bit
+
+            masks.append(mask)
+
+        return {(index % width + left, index // width + top): distance[index] for index in order}
+
+    def _generate_best_neighbours(self, distances):
+        """Calculate the best route based on a distance mapping
+
+        Parameters:
+            distances (dict<tuple<int, int>: int>): A map of positions to
+                                                    distances from end point
+
+        Returns:
+            dict<tuple<int, int>: tuple<int, int>>: A map of the best path to follow
+        """
+        deltas_by_mask = [{delta for bit, delta in enumerate(AXIAL_DELTAS) if mask & (1 << bit)}
+                          for mask in range(1 << len(AXIAL_DELTAS))]
+
+        best_neighbours = {cell: deltas_by_mask[mask].copy() for cell, mask in zip(distances, self._best_masks)}
+        del self._best_masks
+
+        del best_neighbours[self.end]
+
+        return best_neighbours
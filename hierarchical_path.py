@@ -0,0 +1,443 @@
+"""
+Hierarchical path-finding for very large grids, in the style of HPA*
+
+The grid is divided into square clusters. Wherever neighbouring clusters share
+a run of passable cells along their border, one or two pairs of cells in the
+run become portals. Distances between the portals of each cluster are found
+by searching within that cluster only, forming a small abstract graph that is
+searched from the end point instead of the whole grid.
+
+The distance & best deltas of individual cells are only found when first
+needed (i.e. when an enemy enters a cluster), by searching the cell's cluster
+outward from its portals. Placing or removing a tower re-searches only its
+cluster (& neighbouring clusters whose portals change), plus the abstract graph.
+
+Routes leave each cluster through its portals, so are not always the shortest
+route (as found by path.Path), but a cell can reach the end iff it can in Path
+"""
+
+import heapq
+import itertools
+from collections.abc import Mapping
+
+from modules.matrix import AXIAL_DELTAS
+from path import Path
+
+CLUSTER_SIZE = 16
+
+# runs of border crossings at least this long get a portal at both ends, rather than the middle
+LONG_RUN = 6
+
+
+class HierarchicalPath(Path):
+    """A path from a start point to an end point, through a rectangular grid of cells,
+    found over clusters of cells (see module docstring)"""
+
+    def __init__(self, start, end, get_neighbours, size, blocked, cluster_size=CLUSTER_SIZE):
+        """Initialize a path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>): The starting position
+            end (tuple<int, int>): The end position
+            get_neighbours (func<tuple<int, int>>): A function which takes a
+                                                    position and returns the
+                                                    neighbours (used when the
+                                                    path is searched for separators)
+            size (tuple<int, int>): The number of (column, row) cells in the grid
+            blocked (set<tuple<int, int>>): The cells within the grid that can't be passed through
+            cluster_size (int): The number of cells wide & high each cluster is
+        """
+        self._size = size
+        self._blocked = set(blocked)
+        self._cluster_size = cluster_size
+
+        # found by each search (see _search), the first of which keeps no fields
+        self._node_distances = {}
+        self._fields = {}
+        self._overrides = {}
+
+        super().__init__(start, end, get_neighbours)
+
+    def _is_passable(self, cell):
+        """(bool) Returns True iff 'cell' can be passed through"""
+        column, row = cell
+        columns, rows = self._size
+
+        if 0 <= column < columns and 0 <= row < rows:
+            return cell not in self._blocked
+        return cell == self.start or cell == self.end
+
+    def _get_cluster(self, cell):
+        """(tuple<int, int>) Returns the (column, row) position of the cluster containing 'cell'"""
+        return cell[0] // self._cluster_size, cell[1] // self._cluster_size
+
+    def _get_all_clusters(self):
+        """Yields the position of every cluster containing a cell of the grid, start or end"""
+        columns, rows = zip((0, 0), (self._size[0] - 1, self._size[1] - 1), self.start, self.end)
+        (left, top), (right, bottom) = self._get_cluster((min(columns), min(rows))), \
+            self._get_cluster((max(columns), max(rows)))
+
+        for cluster_column in range(left, right + 1):
+            for cluster_row in range(top, bottom + 1):
+                yield cluster_column, cluster_row
+
+    def _get_borders(self, cluster):
+        """Yields the (first, second) pair of clusters of each border of 'cluster',
+        where second is right of or below first"""
+        column, row = cluster
+        yield (column - 1, row), cluster
+        yield (column, row - 1), cluster
+        yield cluster, (column, row + 1)
+        yield cluster, (column + 1, row)
+
+    def _find_portals(self, border):
+        """Returns the portals across a border between two clusters
+
+        Parameters:
+            border (tuple<tuple<int, int>, tuple<int, int>>):
+                (first, second) pair of clusters, where second is right of or below first
+
+        Return:
+            tuple<tuple<tuple<int, int>, tuple<int, int>>, ...>:
+                (inside, outside) pairs of neighbouring cells, inside first & outside second
+        """
+        (column, row), (next_column, next_row) = border
+        size = self._cluster_size
+
+        if next_column > column:
+            # vertical border, crossed from left to right
+            x = next_column * size
+            crossings = [((x - 1, y), (x, y)) for y in range(row * size, (row + 1) * size)]
+        else:
+            # horizontal border, crossed from top to bottom
+            y = next_row * size
+            crossings = [((x, y - 1), (x, y)) for x in range(column * size, (column + 1) * size)]
+
+        portals = []
+        run = []
+        for first, second in crossings + [(None, None)]:
+            if first is not None and self._is_passable(first) and self._is_passable(second):
+                run.append((first, second))
+                continue
+
+            if len(run) >= LONG_RUN:
+                portals.extend((run[0], run[-1]))
+            elif run:
+                portals.append(run[len(run) // 2])
+            run = []
+
+        return tuple(portals)
+
+    def _get_cells(self, cluster):
+        """(frozenset<tuple<int, int>>) Returns the passable cells within 'cluster'"""
+        size = self._cluster_size
+        column, row = cluster
+
+        return frozenset(cell for cell in ((x, y) for x in range(column * size, (column + 1) * size)
+                                           for y in range(row * size, (row + 1) * size))
+                         if self._is_passable(cell))
+
+    @staticmethod
+    def _search_cluster(cells, seeds):
+        """Finds the distance of every cell from the nearest seed, moving only through 'cells'
+
+        Parameters:
+            cells (set<tuple<int, int>>): The passable cells of the cluster to search
+            seeds (dict<tuple<int, int>: int>): The starting distance of each seed cell
+
+        Return:
+            dict<tuple<int, int>: int>: The distance of each cell reached
+        """
+        distances = {}
+        boundary = [(distance, cell) for cell, distance in seeds.items()]
+        heapq.heapify(boundary)
+
+        while boundary:
+            distance, cell = heapq.heappop(boundary)
+            if cell in distances:
+                continue
+            distances[cell] = distance
+
+            x, y = cell
+            for dx, dy in AXIAL_DELTAS:
+                neighbour = x + dx, y + dy
+                if neighbour in cells and neighbour not in distances:
+                    heapq.heappush(boundary, (distance + 1, neighbour))
+
+        return distances
+
+    def _build_cluster(self, cluster):
+        """Finds the abstract graph within 'cluster' from the portals of its borders
+
+        Return:
+            tuple<frozenset, dict, dict>: (cells, partners, edges) triple, where:
+                - cells (frozenset<tuple<int, int>>): The passable cells within cluster
+                - partners (dict<tuple<int, int>: list<tuple<int, int>>>):
+                    The cells across a border paired with each portal cell in cluster
+                - edges (dict<tuple<int, int>: list<tuple<tuple<int, int>, int>>>):
+                    (node, distance) pairs of the other nodes reachable from each
+                    node (portal cell, start or end) within cluster
+        """
+        cells = self._get_cells(cluster)
+        partners = {cell: [] for cell in (self.start, self.end) if cell in cells}
+
+        for border in self._get_borders(cluster):
+            for first, second in self._portals.get(border, ()):
+                inside, outside = (first, second) if first in cells else (second, first)
+                partners.setdefault(inside, []).append(outside)
+
+        edges = {}
+        for node in partners:
+            # breadth-first, as every seed starts at zero
+            distances = {node: 0}
+            boundary = [node]
+            for cell in boundary:
+                x, y = cell
+                for dx, dy in AXIAL_DELTAS:
+                    neighbour = x + dx, y + dy
+                    if neighbour in cells and neighbour not in distances:
+                        distances[neighbour] = distances[cell] + 1
+                        boundary.append(neighbour)
+
+            edges[node] = [(other, distances[other]) for other in partners
+                           if other != node and other in distances]
+
+        return cells, partners, edges
+
+    def _generate(self):
+        """Calculate the portals of every border, the abstract graph of every cluster & the best path"""
+        self._portals = {}
+        clusters = list(self._get_all_clusters())
+
+        for cluster in clusters:
+            for border in list(self._get_borders(cluster))[2:]:
+                self._portals[border] = self._find_portals(border)
+
+        self._clusters = {cluster: self._build_cluster(cluster) for cluster in clusters}
+
+        self._search()
+
+    def _search(self, stale=()):
+        """Searches the abstract graph from the end point, then resets the distances & deltas of cells
+
+        Parameters:
+            stale (set<tuple<int, int>>): The clusters rebuilt since the last search; the cell
+                                          distances & deltas of other clusters are kept if the
+                                          distances of their nodes are unchanged
+
+        Raises:
+            KeyError if the start can not be reached from the end point
+        """
+        node_distances = {}
+        boundary = [(0, self.end)]
+
+        while boundary:
+            distance, node = heapq.heappop(boundary)
+            if node in node_distances:
+                continue
+            node_distances[node] = distance
+
+            _, partners, edges = self._clusters[self._get_cluster(node)]
+            for other, cost in edges[node]:
+                if other not in node_distances:
+                    heapq.heappush(boundary, (distance + cost, other))
+            for other in partners[node]:
+                if other not in node_distances:
+                    heapq.heappush(boundary, (distance + 1, other))
+
+        # ensure the start point can be reached from the end point
+        if self.start not in node_distances:
+            raise KeyError("Cannot reach end from start")
+
+        # a cluster's field depends on the distances of its nodes & the nodes they're paired with
+        old_distances = self._node_distances
+        fields = {}
+        for cluster, field in self._fields.items():
+            if cluster in stale:
+                continue
+
+            partners = self._clusters[cluster][1]
+            if all(node_distances.get(node) == old_distances.get(node)
+                   for node in itertools.chain(partners, *partners.values())):
+                fields[cluster] = field
+
+        self._node_distances = node_distances
+        self._fields = fields
+        self._overrides = {}
+        self._flow_field = None
+
+        self.distances = _CellDistances(self)
+        self.deltas = _CellDeltas(self)
+
+        self._overwrite_best_path()
+
+    def _get_field(self, cluster):
+        """Returns the distance & best deltas of each cell in 'cluster', found on first use
+
+        Return:
+            tuple<dict, dict>: (distances, deltas) pair, where:
+                - distances (dict<tuple<int, int>: int>): The distance of each cell from the end point
+                - deltas (dict<tuple<int, int>: set<tuple<int, int>>>): The best deltas of each cell
+        """
+        field = self._fields.get(cluster)
+        if field is not None:
+            return field
+
+        if cluster not in self._clusters:
+            return {}, {}
+
+        cells, partners, _ = self._clusters[cluster]
+        node_distances = self._node_distances
+
+        distances = self._search_cluster(cells, {node: node_distances[node] for node in partners
+                                                 if node in node_distances})
+
+        deltas = {}
+        for cell in distances:
+            if cell == self.end:
+                continue
+
+            x, y = cell
+            neighbours_by_distance = []
+            for dx, dy in AXIAL_DELTAS:
+                neighbour = x + dx, y + dy
+                if neighbour in distances:
+                    neighbours_by_distance.append((distances[neighbour], (dx, dy)))
+                elif neighbour in partners.get(cell, ()) and neighbour in node_distances:
+                    neighbours_by_distance.append((node_distances[neighbour], (dx, dy)))
+
+            best_distance = min(distance for distance, _ in neighbours_by_distance)
+            deltas[cell] = {delta for distance, delta in neighbours_by_distance if distance == best_distance}
+
+        self._fields[cluster] = field = distances, deltas
+        return field
+
+    def _overwrite_best_path(self):
+        """Overwrites the deltas of cells on the best path with the single delta taken"""
+        self._overrides = {}
+
+        best_path = list(self.get_best_path())
+        best_path[-1] = best_path[-1][0], best_path[-2][1]
+
+        for best, delta in best_path:
+            self._overrides[best] = {delta}
+
+        self._best_cells = [best for best, _ in best_path]
+        self._polylines = None
+
+    def copy(self):
+        """(HierarchicalPath) Returns a copy of this path, which can be repaired independently of it"""
+        path = Path.__new__(type(self))
+        path.__dict__.update(self.__dict__)
+
+        # clusters & portals are replaced rather than changed by repairs, so can be shared
+        path._blocked = set(self._blocked)
+        path._portals = dict(self._portals)
+        path._clusters = dict(self._clusters)
+        path._fields = dict(self._fields)
+
+        path.distances = _CellDistances(path)
+        path.deltas = _CellDeltas(path)
+
+        return path
+
+    def block(self, cells, get_neighbours):
+        """Repairs this path after 'cells' become impassable (i.e. towers are placed)
+
+        Parameters:
+            cells (iter<tuple<int, int>>): The cells that have been blocked
+            get_neighbours (func<tuple<int, int>>): The neighbours function of the
+                                                    grid, with cells blocked
+
+        Raises:
+            KeyError if the end can no longer be reached from the start, in which case
+            this path is left invalid (so a copy should be repaired when unsure)
+        """
+        cells = set(cells)
+        self._blocked.update(cells)
+        self._repair_clusters(cells, get_neighbours)
+
+    def unblock(self, cells, get_neighbours):
+        """Repairs this path after 'cells' become passable (i.e. towers are removed)
+
+        Parameters:
+            cells (iter<tuple<int, int>>): The cells that have been unblocked
+            get_neighbours (func<tuple<int, int>>): The neighbours function of the
+                                                    grid, with cells unblocked
+        """
+        cells = set(cells)
+        self._blocked.difference_update(cells)
+        self._repair_clusters(cells, get_neighbours)
+
+    def _repair_clusters(self, cells, get_neighbours):
+        """Rebuilds the clusters containing 'cells', & neighbouring clusters whose portals
+        changed, then searches the abstract graph again"""
+        self.get_neighbours = get_neighbours
+
+        changed = {self._get_cluster(cell) for cell in cells}
+        stale = set(changed)
+
+        for cluster in changed:
+            for border in self._get_borders(cluster):
+                portals = self._find_portals(border)
+                if portals != self._portals.get(border, ()):
+                    self._portals[border] = portals
+                    stale.update(border)
+
+        for cluster in stale:
+            if cluster in self._clusters:
+                self._clusters[cluster] = self._build_cluster(cluster)
+
+        self._search(stale)
+
+
+class _CellDistances(Mapping):
+    """The distance of each cell of a HierarchicalPath from the end point, found cluster by cluster"""
+
+    def __init__(self, path):
+        self._path = path
+
+    def __getitem__(self, cell):
+        path = self._path
+        return path._get_field(path._get_cluster(cell))[0][cell]
+
+    def __contains__(self, cell):
+        path = self._path
+        return cell in path._get_field(path._get_cluster(cell))[0]
+
+    def __iter__(self):
+        path = self._path
+        for cluster in path._clusters:
+            yield from path._get_field(cluster)[0]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _CellDeltas(Mapping):
+    """The best deltas of each cell of a HierarchicalPath, found cluster by cluster,
+    except along the best path, where only the delta taken is kept"""
+
+    def __init__(self, path):
+        self._path = path
+
+    def __getitem__(self, cell):
+        path = self._path
+
+        deltas = path._overrides.get(cell)
+        if deltas is not None:
+            return deltas
+        return path._get_field(path._get_cluster(cell))[1][cell]
+
+    def __contains__(self, cell):
+        path = self._path
+        return cell in path._overrides or cell in path._get_field(path._get_cluster(cell))[1]
+
+    def __iter__(self):
+        path = self._path
+        for cell in path.distances:
+            if cell in self:
+                yield cell
+
+    def __len__(self):
+        return sum(1 for _ in self)
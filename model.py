@@ -2,15 +2,22 @@
 High-level modelling classes for tower defence game
 """
 
+import time
+from collections import OrderedDict
 from typing import Tuple, List
 
-from core import UnitManager, GameData
+from core import UnitManager, AdaptiveUnitManager, GameData
 from modules.ee import EventEmitter
 from modules.matrix import get_adjacent_cells
+from profiler import PhaseProfiler
 
-from tower import AbstractTower
+from tower import AbstractTower, Pulse, ProjectilePool
 from enemy import AbstractEnemy
 from path import Path
+from flat_path import FlatGridPath
+from compact_path import CompactPath
+from hierarchical_path import HierarchicalPath
+from tower_scheduler import TowerScheduler
 
 __author__ = "Benjamin Martin and Brae Webb"
 __copyright__ = "Copyright 2018, The University of Queensland"
@@ -22,6 +29,9 @@ PIXEL_SIZE = (24, 12)
 
 GRID_SIZE = (6, 6)
 
+# The number of hypothetical paths kept for placement previews (see TowerGame.attempt_placement)
+PATH_CACHE_SIZE = 64
+
 
 class GridCoordinateTranslator:
     """Translates coordinates between cells in a grid (column, row) & pixels (x, y)
@@ -123,10 +133,71 @@ class TowerGame(EventEmitter):
     """Model for a game of tower defence"""
     _current_step = -1
 
-    def __init__(self, size=GRID_SIZE, cell_size=CELL_SIZE):
-        """Construct a new tower defence game"""
+    # (phase name, step method name) pairs, in the order they are run each step
+    STEP_PHASES = (
+        ('unit_managers', '_update_unit_managers'),
+        ('obstacles', '_step_obstacles'),
+        ('enemies', '_step_enemies'),
+        ('towers', '_step_towers'),
+        ('spawn', '_spawn_enemies'),
+    )
+
+    # ways of generating paths from scratch (see __init__)
+    PATH_BACKENDS = ('dict', 'flat', 'compact', 'hierarchical')
+
+    _profiler = None
+    _emit_profile = False
+
+    # cells that would block the path if a tower were placed on them, else None until needed
+    _separators = None
+
+    # incremented whenever the towers (& hence path) change
+    _layout_version = 0
+
+    def __init__(self, size=GRID_SIZE, cell_size=CELL_SIZE, adaptive_buckets=False, enemy_store=False,
+                 path_backend='dict', flow_field=False, arc_length=False, projectile_pool=False,
+                 tower_scheduler=False):
+        """Construct a new tower defence game
+
+        Parameters:
+            size (tuple<int, int>): The number of (column, row) cells in the grid
+            cell_size (int): The side length of each cell, in pixels
+            adaptive_buckets (bool): If True, enemies & obstacles are bucketed by cell size
+                                     & tower range, rebalancing as they crowd together,
+                                     rather than into a fixed 10x10 buckets
+            enemy_store (bool): If True, enemy state is mirrored into numpy arrays each step
+                                (see enemy_store.EnemyStore), towers find their targets & pulses
+                                their collisions with batched, vectorised queries, and missiles
+                                are stepped together (see missile_batch) (requires numpy)
+            path_backend (str): How paths are generated from scratch, one of PATH_BACKENDS:
+                                'dict' searches cell by cell through a neighbours function,
+                                'flat' searches arrays over the whole grid (see flat_path),
+                                'compact' searches as 'flat', then encodes the path into
+                                a single buffer (see compact_path),
+                                'hierarchical' searches between clusters of cells, then within
+                                each cluster as needed (see hierarchical_path)
+            flow_field (bool): If True, enemies follow the path through a flow field of dense
+                               arrays (see path.FlowField), rebuilt whenever the path changes
+            arc_length (bool): If True, enemies move by distance along the best path's polyline
+                               (see path.Polyline & SimpleEnemy.step), rather than cell by cell.
+                               With enemy_store, every such enemy is moved at once, in array
+                               operations (see EnemyStore.advance)
+            projectile_pool (bool): If True, expired missiles & pulses are reused for new ones
+                                    (see tower.ProjectilePool), rather than left to be collected
+            tower_scheduler (bool): If True, towers are only stepped when they may do more than
+                                    cool down, sleeping until their cool down expires or an enemy
+                                    enters their range (see tower_scheduler.TowerScheduler)
+        """
         super().__init__()
 
+        if path_backend not in self.PATH_BACKENDS:
+            raise ValueError(f"Unknown path backend {path_backend!r}; "
+                             f"expected one of {', '.join(self.PATH_BACKENDS)}")
+        self._path_backend = path_backend
+        self._use_flow_field = flow_field
+        self._use_arc_length = arc_length
+        self._tower_scheduler = TowerScheduler() if tower_scheduler else None
+
         self.grid = GridCoordinateTranslator(cells=size, cell_size=cell_size)
 
         self.towers = {}
@@ -142,15 +213,32 @@ class TowerGame(EventEmitter):
         self.enemies = []
         self._unspawned_enemies = []
 
+        # hypothetical paths by (layout version, cell), least recently used first
+        self._path_cache = OrderedDict()
+
         # Game data to be passed to units when stepped
         # It's poor form to pass entire game model, so distinct object is
         # used without special methods (i.e. step methods)
         self._data = GameData()
-        self._data.enemies = UnitManager(self.grid.pixels)
-        self._data.obstacles = UnitManager(self.grid.pixels)
+        if adaptive_buckets:
+            self._data.enemies = AdaptiveUnitManager(self.grid.pixels, cell_size)
+            self._data.obstacles = AdaptiveUnitManager(self.grid.pixels, cell_size)
+        else:
+            self._data.enemies = UnitManager(self.grid.pixels)
+            self._data.obstacles = UnitManager(self.grid.pixels)
         self._data.towers = self.towers
         self._data.path = self.path
         self._data.grid = self.grid
+        if flow_field:
+            self._data.flow_field = self.path.get_flow_field(self._get_path_bounds())
+        if arc_length:
+            self._data.polyline = self.path.get_polyline(self.grid.cell_size)
+        if projectile_pool:
+            self._data.projectile_pool = ProjectilePool()
+
+        if enemy_store:
+            from enemy_store import EnemyStore
+            self._data.enemy_store = EnemyStore(self.grid.pixels)
 
     def is_wave_over(self):
         """(bool) Returns True iff there is no wave in progress"""
@@ -170,6 +258,38 @@ class TowerGame(EventEmitter):
         towers = set(self.towers.keys())
         towers.update(extra_towers)
 
+        # create a path from start to end avoiding towers
+        get_neighbours = self._make_get_neighbours(towers)
+        if self._path_backend == 'flat':
+            path = FlatGridPath(self._start, self._end, get_neighbours, self.grid.cells, towers)
+        elif self._path_backend == 'compact':
+            path = FlatGridPath(self._start, self._end, get_neighbours, self.grid.cells, towers)
+            path = CompactPath.from_path(path, bounds=self._get_path_bounds())
+        elif self._path_backend == 'hierarchical':
+            path = HierarchicalPath(self._start, self._end, get_neighbours, self.grid.cells, towers)
+        else:
+            path = Path(self._start, self._end, get_neighbours)
+        self._start, self._end = path.start, path.end
+
+        return path
+
+    def _get_path_bounds(self):
+        """(tuple<int, int, int, int>) Returns the (left, top, width, height) rectangle of cells
+        containing the grid, start & end, i.e. every cell a path could pass through"""
+        columns, rows = zip((0, 0), self._start, self._end)
+        left, top = min(columns), min(rows)
+        right = max(max(columns) + 1, self.grid.cells[0])
+        bottom = max(max(rows) + 1, self.grid.cells[1])
+
+        return left, top, right - left, bottom - top
+
+    def _make_get_neighbours(self, towers):
+        """Returns a function yielding the neighbours of a cell, avoiding 'towers' (see Path)
+
+        Parameters:
+            towers (set<tuple<int, int>>): The positions of every tower
+        """
+
         def get_neighbours(cell, from_=True):  # pylint: disable=unused-argument
             """Yields all the positions neighbouring cell
 
@@ -183,10 +303,33 @@ class TowerGame(EventEmitter):
                         or node == self._start or node == self._end:
                     yield node
 
-        # create a path from start to end avoiding towers
-        path = Path(self._start, self._end, get_neighbours)
-        self._start, self._end = path.start, path.end
+        return get_neighbours
 
+    def _set_path(self, path):
+        """Sets the path for enemies to follow, after the towers have changed"""
+        self._data.path = self.path = path
+        self._separators = None
+
+        if self._use_flow_field:
+            self._data.flow_field = path.get_flow_field(self._get_path_bounds())
+        if self._use_arc_length:
+            self._data.polyline = path.get_polyline(self.grid.cell_size)
+
+        self._layout_version += 1
+        self._path_cache.clear()
+
+        # towers only change along with the path
+        if self._tower_scheduler is not None:
+            self._tower_scheduler.sync(self.towers.values())
+
+    def _get_path_with(self, cell):
+        """(Path) Returns the path if a tower were placed at 'cell', repaired from the current path
+
+        Raises:
+            KeyError if placing a tower at cell would block the path
+        """
+        path = self.path.copy()
+        path.block((cell,), self._make_get_neighbours(set(self.towers) | {cell}))
         return path
 
     def remove(self, cell):
@@ -205,7 +348,10 @@ class TowerGame(EventEmitter):
             raise KeyError(f"No tower exists at {cell}")
 
         tower = self.towers.pop(cell)
-        self._data.path = self.path = self.generate_path()
+
+        path = self.path.copy()
+        path.unblock((cell,), self._make_get_neighbours(set(self.towers)))
+        self._set_path(path)
 
         return tower
 
@@ -238,13 +384,13 @@ class TowerGame(EventEmitter):
 
         # check a path can still be made
         try:
-            self.generate_path(cell)
+            path = self._get_path_with(cell)
         except KeyError:
             return False
 
         self.towers[cell] = tower
         old_path = self.path
-        self._data.path = self.path = self.generate_path()
+        self._set_path(path)
 
         self._resolve_problems_after_placement(cell, old_path)
 
@@ -268,7 +414,7 @@ class TowerGame(EventEmitter):
 
         if len(problems):
             sources = set(old_path.get_sources(cell))
-            for path_cell, _ in self.path.get_best_path():
+            for path_cell in self.path.get_best_cells():
                 if path_cell in sources:
                     source = path_cell
                     break
@@ -284,34 +430,104 @@ class TowerGame(EventEmitter):
                 enemy.position = position
 
     def _step_obstacles(self):
-        """Performs a single time step for all obstacles"""
-        remaining_obstacles = []
-        for obstacle in self.obstacles:
-            persist, new_obstacles = obstacle.step(self._data)
+        """Performs a single time step for all obstacles
+
+        Expired obstacles are compacted out of the obstacle list in place, and any new obstacles
+        are added to its end. With an enemy store, missiles are stepped together beforehand
+        (see _step_missiles)
+        """
+        obstacles = self.obstacles
+        pool = self._data.projectile_pool
+        added = []
+
+        batched = {}
+        store = self._data.enemy_store
+        if store is not None:
+            self._find_pulse_collisions(store)
+            batched = self._step_missiles()
+
+        # persisting obstacles are moved down over expired ones, never past the one being stepped
+        kept = 0
+        for obstacle in obstacles:
+            persist = batched.get(obstacle)
+            if persist is None:
+                persist, new_obstacles = obstacle.step(self._data)
+            else:
+                new_obstacles = None
+
             if persist:
-                remaining_obstacles.append(obstacle)
+                obstacles[kept] = obstacle
+                kept += 1
+            else:
+                self._data.obstacles.remove_unit(obstacle)
+                if pool is not None:
+                    pool.release(obstacle)
             if new_obstacles:
-                remaining_obstacles.extend(new_obstacles)
+                added.extend(new_obstacles)
+
+        del obstacles[kept:]
+        obstacles.extend(added)
+
+    def _step_missiles(self):
+        """Performs a single time step for every missile at once, in array operations
+        (see missile_batch.step_missiles)
+
+        Missiles are stepped before any other obstacle, rather than in turn with them
+
+        Return:
+            dict<Missile: bool>: True for each missile stepped iff it should persist
+        """
+        from missile_batch import can_batch, step_missiles
+
+        missiles = [obstacle for obstacle in self.obstacles if can_batch(obstacle)]
+        return dict(zip(missiles, step_missiles(missiles)))
+
+    def _find_pulse_collisions(self, store):
+        """Finds the enemies every pulse will collide with over its next step, together
+        through the enemy store (see Pulse.collisions & EnemyStore.get_all_in_boxes)
+
+        Enemies spawned since the store was last updated are added to its end first, so it
+        holds every enemy in the game
+        """
+        pulses = [obstacle for obstacle in self.obstacles if isinstance(obstacle, Pulse)]
+        if not pulses:
+            return
 
-        self.obstacles = remaining_obstacles
+        store.extend(self.enemies[len(store):])
+
+        # limited to the enemies a pulse would find searching the buckets it passes through
+        boxes = [pulse.get_swept_box() for pulse in pulses]
+        bucket_size = self._data.enemies.get_bucket_size()
+        for pulse, collisions in zip(pulses, store.get_all_in_boxes(boxes, bucket_size)):
+            pulse.collisions = collisions
 
     def _step_enemies(self):
         """Performs a single time step for all enemies"""
-        remaining_enemies = []
-        dead_enemies = []
-        escaped_enemies = []
-
-        for _, enemy in enumerate(self.enemies):
-            # remove dead enemies
-            if enemy.is_dead():
-                dead_enemies.append(enemy)
-                continue
-
-            # keep enemies who are still in bounds
-            if enemy.step(self._data):
-                remaining_enemies.append(enemy)
-            else:
-                escaped_enemies.append(enemy)
+        store = self._data.enemy_store
+        if store is not None and self._data.polyline is not None:
+            remaining_enemies, dead_enemies, escaped_enemies = self._advance_enemies(store)
+        else:
+            remaining_enemies = []
+            dead_enemies = []
+            escaped_enemies = []
+
+            for _, enemy in enumerate(self.enemies):
+                # remove dead enemies
+                if enemy.is_dead():
+                    dead_enemies.append(enemy)
+                    continue
+
+                # keep enemies who are still in bounds
+                if enemy.step(self._data):
+                    remaining_enemies.append(enemy)
+                else:
+                    escaped_enemies.append(enemy)
+
+            if store is not None:
+                store.sync(remaining_enemies)
+
+        for enemy in dead_enemies + escaped_enemies:
+            self._data.enemies.remove_unit(enemy)
 
         # emit enemy events
         if len(escaped_enemies) > 0:
@@ -319,18 +535,91 @@ class TowerGame(EventEmitter):
         self.emit("enemy_death", dead_enemies)
 
         self.enemies = remaining_enemies
+
         if len(remaining_enemies) == 0 and len(self._unspawned_enemies) == 0:
             self.emit("cleared")
 
+    def _advance_enemies(self, store):
+        """Performs a single time step for all enemies moving by arc-length, advancing them together
+        through the enemy store (see EnemyStore.advance)
+
+        Enemies spawned since the last step are added to the end of the store, so it stays in
+        the same order as self.enemies. Only enemies left off the best path are stepped one by one
+
+        Return:
+            tuple<list<AbstractEnemy>, list<AbstractEnemy>, list<AbstractEnemy>>:
+                The remaining, dead & escaped enemies
+        """
+        store.extend(self.enemies[len(store):])
+
+        dead, escaped, stranded = store.advance(self._data.polyline)
+
+        for i in stranded:
+            if not store.enemies[i].step(self._data):
+                escaped.append(i)
+            store.refresh(i)
+
+        escaped.sort()
+        dead_enemies = [store.enemies[i] for i in dead]
+        escaped_enemies = [store.enemies[i] for i in escaped]
+
+        store.remove(dead + escaped)
+
+        return list(store.enemies), dead_enemies, escaped_enemies
+
     def _step_towers(self):
-        """Performs a single time step for all towers"""
+        """Performs a single time step for all towers
+
+        With a tower scheduler, only the towers it wakes are stepped (see tower_scheduler)
+        """
+        store = self._data.enemy_store
+        scheduler = self._tower_scheduler
+
+        towers = self.towers.values()
+        if scheduler is not None:
+            is_occupied = self._get_bucket_occupancy()
+            towers = scheduler.wake(is_occupied, self._data.enemies.layout_version)
+
+        if store is not None:
+            for tower, enemies in store.get_all_in_range(towers).items():
+                tower.enemies_in_range = enemies
+
         # process tower abilities (attacks, etc.)
-        for tower in self.towers.values():
+        for tower in towers:
             obstacles = tower.step(self._data)
 
             if obstacles:
                 self.obstacles.extend(obstacles)
 
+        if store is not None:
+            for tower in towers:
+                tower.enemies_in_range = None
+
+        if scheduler is not None:
+            scheduler.settle(self._get_range_buckets, is_occupied)
+
+    def _get_bucket_occupancy(self):
+        """Returns a function of a (column, row) bucket index (of self._data.enemies) that is True
+        iff an enemy towers could target may be within that bucket
+
+        With an enemy store, towers target enemies by their current positions, rather than the
+        bucket they were last moved to, so occupancy is taken from the store
+        """
+        store = self._data.enemy_store
+        if store is None:
+            return self._data.enemies.is_occupied
+
+        return store.get_occupied_buckets(self._data.enemies.get_bucket_size()).__contains__
+
+    def _get_range_buckets(self, tower):
+        """(list<tuple<int, int>>) Returns the index of every bucket (of self._data.enemies)
+        overlapping 'tower's range, else None if its range is unbounded"""
+        box = tower.get_range_box()
+        if box is None:
+            return None
+
+        return list(self._data.enemies.get_nearby_indices(tower.position, bounds=box))
+
     def _spawn_enemies(self):
         """Spawn all the enemies to be spawned in the current time-step"""
         while len(self._unspawned_enemies):
@@ -347,6 +636,23 @@ class TowerGame(EventEmitter):
             enemy.position = self.grid.cell_to_pixel_centre(self.path.start)
             self.enemies.append(enemy)
 
+    def _update_unit_managers(self):
+        """Moves enemies & obstacles between buckets of their spatial indices, as their positions change
+
+        Units leaving the game are removed as they leave (see _step_enemies & _step_obstacles)
+        """
+        update_enemy = self._data.enemies.update_unit
+        for enemy in self.enemies:
+            update_enemy(enemy)
+
+        update_obstacle = self._data.obstacles.update_unit
+        for obstacle in self.obstacles:
+            update_obstacle(obstacle)
+
+        if isinstance(self._data.enemies, AdaptiveUnitManager):
+            self._data.enemies.rebalance()
+            self._data.obstacles.rebalance()
+
     def step(self):
         """Performs a single time step of the game
 
@@ -356,24 +662,52 @@ class TowerGame(EventEmitter):
         self._current_step += 1
 
         if self._current_step % 2 == 0:
-            self._data.enemies.clear()
-            self._data.obstacles.clear()
+            if self._profiler is None:
+                # perform all step actions
+                self._update_unit_managers()
+                self._step_obstacles()
+                self._step_enemies()
+                self._step_towers()
+                self._spawn_enemies()
+            else:
+                self._profiled_step()
 
-            for enemy in self.enemies:
-                if self.grid.is_pixel_valid(enemy.position):
-                    self._data.enemies.add_unit(enemy)
-            
-            for obstacle in self.obstacles:
-                if self.grid.is_pixel_valid(obstacle.position):
-                    self._data.obstacles.add_unit(obstacle)
+        return len(self._unspawned_enemies) or len(self.enemies)
 
-            # perform all step actions
-            self._step_obstacles()
-            self._step_enemies()
-            self._step_towers()
-            self._spawn_enemies()
+    def _profiled_step(self):
+        """Performs all step actions, timing each phase"""
+        timings = {}
+        for phase, method in self.STEP_PHASES:
+            start = time.perf_counter()
+            getattr(self, method)()
+            timings[phase] = elapsed = time.perf_counter() - start
+            self._profiler.record(phase, elapsed)
 
-        return len(self._unspawned_enemies) or len(self.enemies)
+        if self._emit_profile:
+            self.emit("profile", timings)
+
+    def enable_profiling(self, window=240, emit=False):
+        """Starts timing each phase of every step
+
+        Parameters:
+            window (int): The number of most recent steps to keep timings for
+            emit (bool): If True, a "profile" event is emitted after each step, with
+                         a dict mapping each phase name to the time it took (in seconds)
+        """
+        self._profiler = PhaseProfiler((phase for phase, _ in self.STEP_PHASES), window=window)
+        self._emit_profile = emit
+
+    def disable_profiling(self):
+        """Stops timing steps, discarding any recorded timings"""
+        self._profiler = None
+        self._emit_profile = False
+
+    def get_profile_stats(self):
+        """(dict<str: PhaseStats>) Returns rolling statistics for each phase of a step,
+        or an empty dict if profiling is disabled"""
+        if self._profiler is None:
+            return {}
+        return self._profiler.get_all_stats()
 
     def reset(self):
         """Resets the game"""
@@ -381,9 +715,11 @@ class TowerGame(EventEmitter):
         self.enemies = []
         self.obstacles = []
         self._unspawned_enemies = []
-        self._data.path = self.path = self.generate_path()
+        self._set_path(self.generate_path())
         self._data.enemies.clear()
         self._data.obstacles.clear()
+        if self._data.enemy_store is not None:
+            self._data.enemy_store.sync(())
 
     def queue_wave(self, wave, clear=False):
         """Queues a wave of enemies to spawn into the game
@@ -405,6 +741,9 @@ class TowerGame(EventEmitter):
 
         if clear:
             self.enemies = []
+            self._data.enemies.clear()
+            if self._data.enemy_store is not None:
+                self._data.enemy_store.sync(())
 
     def attempt_placement(self, position):
         """Checks legality of potentially placing a tower at 'position'
@@ -418,15 +757,23 @@ class TowerGame(EventEmitter):
         # convert mouse position to grid coordinates
         grid_position = self.grid.pixel_to_cell(position)
 
-        # make a path and determine whether it is possible
-        try:
-            path = self.generate_path(grid_position)
-            legal = True
-        except KeyError:
-            path = self.path
-            legal = False
+        if not self.grid.is_cell_valid(grid_position):
+            return True, self.path
+
+        # cells that would block the path only change with the towers, so are found once
+        if self._separators is None:
+            self._separators = self.path.get_separators()
+
+        if grid_position in self.towers or grid_position in self._separators:
+            return False, self.path
 
-        if grid_position in self.towers:
-            legal = False
+        key = self._layout_version, grid_position
+        path = self._path_cache.get(key)
+        if path is None:
+            path = self._path_cache[key] = self._get_path_with(grid_position)
+            if len(self._path_cache) > PATH_CACHE_SIZE:
+                self._path_cache.popitem(last=False)
+        else:
+            self._path_cache.move_to_end(key)
 
-        return legal, path
+        return True, path
@@ -17,6 +17,9 @@ Path-finding logic for navigating a grid with obstacles
 #              \\ "
 #               '=='
 
+import heapq
+from array import array
+from bisect import bisect_right
 from queue import Queue
 
 __author__ = "Benjamin Martin and Brae Webb"
@@ -35,7 +38,11 @@ class Path:
         end (tuple<int, int>): The ending point
         deltas (dict<tuple<int, int>: tuple<int, int>>): A map of the
                                                                   best path to follow
+        distances (dict<tuple<int, int>: int>): A map of positions to the number
+                                                of steps from the end point
     """
+    _flow_field = None
+    _polylines = None
 
     def __init__(self, start, end, get_neighbours):
         """Initialize a path from a starting point to a finishing point
@@ -89,24 +96,35 @@ class Path:
 
         # Calculate best neighbours
         for from_ in distances:
-            neighbours_by_distance = []
-            for to in self.get_neighbours(from_, from_=True):
-                neighbours_by_distance.append((distances[to], to))
+            best_neighbours[from_] = self._find_best_deltas(from_, distances)
 
-            neighbours_by_distance.sort(key=lambda x: x[0])
+        del best_neighbours[self.end]
 
-            best_distance = neighbours_by_distance[0][0]
-            best_deltas = set()
-            for distance, neighbour in neighbours_by_distance:
-                if distance == best_distance:
-                    delta = tuple(a - b for a, b in zip(neighbour, from_))
-                    best_deltas.add(delta)
+        return best_neighbours
 
-            best_neighbours[from_] = best_deltas
+    def _find_best_deltas(self, from_, distances):
+        """(set<tuple<int, int>>) Returns the changes in position from 'from_' to each of
+        its neighbours closest to the end point
 
-        del best_neighbours[self.end]
+        Parameters:
+            from_ (tuple<int, int>): The position to find the best neighbours of
+            distances (dict<tuple<int, int>: int>): A map of positions to
+                                                    distances from end point
+        """
+        neighbours_by_distance = []
+        for to in self.get_neighbours(from_, from_=True):
+            neighbours_by_distance.append((distances[to], to))
 
-        return best_neighbours
+        neighbours_by_distance.sort(key=lambda x: x[0])
+
+        best_distance = neighbours_by_distance[0][0]
+        best_deltas = set()
+        for distance, neighbour in neighbours_by_distance:
+            if distance == best_distance:
+                delta = tuple(a - b for a, b in zip(neighbour, from_))
+                best_deltas.add(delta)
+
+        return best_deltas
 
     def _generate(self):
         """Calculate the best path to travel through the path"""
@@ -116,9 +134,13 @@ class Path:
         if self.start not in distances:
             raise KeyError("Cannot reach end from start")
 
+        self.distances = distances
         self.deltas = self._generate_best_neighbours(distances)
 
-        # overwrite bests on path
+        self._overwrite_best_path()
+
+    def _overwrite_best_path(self):
+        """Overwrites the deltas of cells on the best path with the single delta taken"""
         best_path = list(self.get_best_path())
 
         best_path[-1] = best_path[-1][0], best_path[-2][1]
@@ -129,6 +151,214 @@ class Path:
         for best, delta in best_path:
             self.deltas[best] = {delta}
 
+        self._best_cells = [best for best, _ in best_path]
+        self._polylines = None
+
+    def copy(self):
+        """(Path) Returns a copy of this path, which can be repaired independently of it"""
+        path = Path.__new__(type(self))
+        path.__dict__.update(self.__dict__)
+
+        path.distances = dict(self.distances)
+        path.deltas = dict(self.deltas)
+        path._flow_field = None
+
+        return path
+
+    def block(self, cells, get_neighbours):
+        """Repairs this path after 'cells' become impassable (i.e. towers are placed)
+
+        Parameters:
+            cells (iter<tuple<int, int>>): The cells that have been blocked
+            get_neighbours (func<tuple<int, int>>): The neighbours function of the
+                                                    grid, with cells blocked
+
+        Raises:
+            KeyError if the end can no longer be reached from the start, in which case
+            this path is left invalid (so a copy should be repaired when unsure)
+        """
+        self._repair(set(cells), set(), get_neighbours)
+
+    def unblock(self, cells, get_neighbours):
+        """Repairs this path after 'cells' become passable (i.e. towers are removed)
+
+        Parameters:
+            cells (iter<tuple<int, int>>): The cells that have been unblocked
+            get_neighbours (func<tuple<int, int>>): The neighbours function of the
+                                                    grid, with cells unblocked
+        """
+        self._repair(set(), set(cells), get_neighbours)
+
+    def _repair(self, blocked, unblocked, get_neighbours):
+        """Repairs the distance map & deltas of this path after the passability of some cells
+        has changed, visiting only the cells whose distances change (& their neighbours)
+
+        Parameters:
+            blocked (set<tuple<int, int>>): The cells that have become impassable
+            unblocked (set<tuple<int, int>>): The cells that have become passable
+            get_neighbours (func<tuple<int, int>>): The neighbours function of the new grid
+        """
+        self.get_neighbours = get_neighbours
+        self._flow_field = None
+
+        distances = self.distances
+        changed = set()
+
+        for cell in blocked:
+            if distances.pop(cell, None) is not None:
+                changed.add(cell)
+
+        # find cells whose every shortest route to the end passed through a blocked cell,
+        # in order of distance so that whether each cell's neighbours are affected is settled first
+        candidates = [(distances[neighbour], neighbour) for cell in blocked
+                      for neighbour in get_neighbours(cell, from_=False) if neighbour in distances]
+        heapq.heapify(candidates)
+        affected = set()
+
+        while candidates:
+            distance, cell = heapq.heappop(candidates)
+            if cell in affected or cell == self.end:
+                continue
+
+            if any(distances.get(neighbour) == distance - 1 and neighbour not in affected
+                   for neighbour in get_neighbours(cell, from_=True)):
+                continue
+
+            affected.add(cell)
+            for neighbour in get_neighbours(cell, from_=False):
+                if distances.get(neighbour) == distance + 1:
+                    heapq.heappush(candidates, (distance + 1, neighbour))
+
+        for cell in affected:
+            del distances[cell]
+        changed |= affected
+
+        # relax outward from the settled neighbours of affected & unblocked cells
+        boundary = []
+        for cell in affected | unblocked:
+            known = [distances[neighbour] for neighbour in get_neighbours(cell, from_=True)
+                     if neighbour in distances]
+            if known:
+                boundary.append((min(known) + 1, cell))
+        heapq.heapify(boundary)
+
+        while boundary:
+            distance, cell = heapq.heappop(boundary)
+            if distances.get(cell, float('inf')) <= distance:
+                continue
+
+            distances[cell] = distance
+            changed.add(cell)
+
+            for neighbour in get_neighbours(cell, from_=False):
+                if distances.get(neighbour, float('inf')) > distance + 1:
+                    heapq.heappush(boundary, (distance + 1, neighbour))
+
+        if self.start not in distances:
+            raise KeyError("Cannot reach end from start")
+
+        # best deltas depend only on neighbouring distances, so only change around changed cells,
+        # except along the best path, which is recalculated from scratch
+        stale = set(changed)
+        for cell in changed:
+            stale.update(get_neighbours(cell, from_=False))
+        stale.update(self._best_cells)
+
+        deltas = self.deltas
+        for cell in stale:
+            if cell in distances and cell != self.end:
+                deltas[cell] = self._find_best_deltas(cell, distances)
+            else:
+                deltas.pop(cell, None)
+
+        self._overwrite_best_path()
+
+    def get_separators(self):
+        """Finds the cells that every route from start to end passes through, i.e. those that
+        would disconnect start from end if blocked (excluding start & end themselves)
+
+        Uses a single depth-first search from start (finding articulation points): a cell
+        separates start from end iff end lies in the subtree of a child of the cell whose
+        subtree has no edge back above the cell
+
+        Return:
+            set<tuple<int, int>>: The separating cells
+        """
+        order = {self.start: 0}  # discovery order of each cell
+        low = {self.start: 0}  # lowest discovery order reachable from each cell's subtree
+        end_order = None
+        separators = set()
+
+        # (cell, parent, neighbours still to visit) for each cell on the current branch
+        stack = [(self.start, None, self.get_neighbours(self.start, from_=False))]
+
+        while stack:
+            cell, parent, neighbours = stack[-1]
+
+            for neighbour in neighbours:
+                if neighbour not in order:
+                    order[neighbour] = low[neighbour] = len(order)
+                    if neighbour == self.end:
+                        end_order = order[neighbour]
+                    stack.append((neighbour, cell, self.get_neighbours(neighbour, from_=False)))
+                    break
+
+                if neighbour != parent:
+                    low[cell] = min(low[cell], order[neighbour])
+            else:
+                stack.pop()
+                if parent is None:
+                    continue
+
+                low[parent] = min(low[parent], low[cell])
+
+                # cells discovered after cell (& still being discovered when it finished) are its subtree
+                if parent != self.start and low[cell] >= order[parent] \
+                        and end_order is not None and order[cell] <= end_order:
+                    separators.add(parent)
+
+        return separators
+
+    def get_flow_field(self, bounds=None):
+        """(FlowField) Returns this path as a flow field, built once & kept until this path is repaired
+
+        Parameters:
+            bounds (tuple<int, int, int, int>): The (left, top, width, height) rectangle of cells
+                                                the field covers, else None for the smallest
+                                                rectangle containing every cell of this path
+        """
+        if bounds is None:
+            columns, rows = zip(*self.distances)
+            bounds = min(columns), min(rows), max(columns) - min(columns) + 1, max(rows) - min(rows) + 1
+
+        if self._flow_field is None or self._flow_field.bounds != bounds:
+            self._flow_field = FlowField(self, bounds)
+
+        return self._flow_field
+
+    def get_best_cells(self):
+        """(list<tuple<int, int>>) Returns the cells on the best path, from start to end
+
+        The list is built once (when the path is generated or repaired), so must not be modified
+        """
+        return self._best_cells
+
+    def get_polyline(self, cell_size):
+        """(Polyline) Returns the best path in pixels, built once per cell size & kept until
+        this path is repaired
+
+        Parameters:
+            cell_size (int): The length of each cell, in pixels
+        """
+        if self._polylines is None:
+            self._polylines = {}
+
+        polyline = self._polylines.get(cell_size)
+        if polyline is None:
+            polyline = self._polylines[cell_size] = Polyline(self._best_cells, cell_size)
+
+        return polyline
+
     def get_best_path(self):
         """Yields (position, delta) pairs on best path, from start to end
         
@@ -167,10 +397,7 @@ class Path:
         Yields:
             tuple<int, int>: The best sequence of positions to reach the end
         """
-        for best, delta in self.get_best_path():
-            yield best
-            if delta is None:
-                break
+        yield from self._best_cells
 
     def get_best_delta(self, cell, previous=None):
         """(tuple<int, int>) Returns change in (column, row) position to reach next point on path
@@ -183,16 +410,207 @@ class Path:
             return previous
         return next(iter(self.deltas[cell]))
 
+    def get_distance_remaining(self, cell, offset=(0, 0)):
+        """(float) Returns the distance (in cells) left to travel from a position to the end point,
+        else infinity if the end can not be reached from the position
+
+        Parameters:
+            cell (tuple<int, int>): The (column, row) cell of the position
+            offset (tuple<float, float>): The fractional offset of the position from the
+                                          centre of cell (see pixel_to_cell_offset)
+        """
+        distance = self.distances.get(cell)
+        if distance is None:
+            return float('inf')
+
+        deltas = self.deltas.get(cell)
+        if not deltas:
+            return distance
+
+        # progress already made within cell toward the next
+        dx, dy = next(iter(deltas))
+        return distance - (offset[0] * dx + offset[1] * dy)
+
     def get_sources(self, destination):
         """Yields the cell(s) that flow into destination
         
         Parameters:
             destination (tuple<int, int>): The destination cell 
+
+        Note:
+            A cell can only flow into one of its neighbours, so only the neighbours of
+            destination are checked, rather than every cell on the path
         """
+        for source in self.get_neighbours(destination, from_=False):
+            deltas = self.deltas.get(source)
+            if deltas and tuple(a - b for a, b in zip(destination, source)) in deltas:
+                yield source
 
-        for source, deltas in self.deltas.items():
-            for delta in deltas:
-                next_ = tuple(a + b for a, b in zip(source, delta))
+    def get_upstream(self, destination):
+        """Yields every cell that eventually flows into destination, nearest first
 
-                if next_ == destination:
+        Parameters:
+            destination (tuple<int, int>): The destination cell
+        """
+        visited = {destination}
+        boundary = [destination]
+
+        for cell in boundary:
+            for source in self.get_sources(cell):
+                if source not in visited:
+                    visited.add(source)
+                    boundary.append(source)
                     yield source
+
+
+class Polyline:
+    """The best path of a Path in pixels, through the centre of each cell on it
+
+    Attributes:
+        cells (list<tuple<int, int>>): The (column, row) cells on the path, from start to end
+        points (list<tuple<int, int>>): The pixel position at the centre of each cell
+        lengths (array<float>): The distance (in pixels) along the path from start to each point
+        length (float): The total distance (in pixels) from start to end
+    """
+
+    def __init__(self, cells, cell_size):
+        """Constructor
+
+        Parameters:
+            cells (list<tuple<int, int>>): The cells on the path, from start to end
+            cell_size (int): The length of each cell, in pixels
+        """
+        self.cells = cells
+        self.cell_size = cell_size
+
+        # as GridCoordinateTranslator.cell_to_pixel_centre
+        self.points = points = [(int((column + .5) * cell_size), int((row + .5) * cell_size))
+                                for column, row in cells]
+
+        self.lengths = lengths = array('d', [0.])
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            lengths.append(lengths[-1] + abs(x1 - x0) + abs(y1 - y0))
+
+        self.length = lengths[-1]
+
+        self._indices = {cell: i for i, cell in enumerate(cells)}
+
+    def get_position(self, distance):
+        """(tuple<float, float>) Returns the pixel position 'distance' pixels along the path from start
+
+        Distances before start are clamped to it, while those beyond end continue in the
+        direction of the last step (so an enemy can leave the end cell)
+        """
+        if distance <= 0 or len(self.points) == 1:
+            return self.points[0]
+
+        i = min(bisect_right(self.lengths, distance), len(self.points) - 1) - 1
+        (x0, y0), (x1, y1) = self.points[i], self.points[i + 1]
+        along = (distance - self.lengths[i]) / (self.lengths[i + 1] - self.lengths[i])
+
+        return x0 + (x1 - x0) * along, y0 + (y1 - y0) * along
+
+    def project(self, position):
+        """(float) Returns the distance (in pixels) along the path from start to 'position',
+        else None if position is not on the path (to within a pixel)
+
+        Only the segments either side of the cell containing position are considered,
+        so projecting costs the same however long the path is
+
+        Parameters:
+            position (tuple<float, float>): The pixel position to project
+        """
+        x, y = position
+        i = self._indices.get((int(x // self.cell_size), int(y // self.cell_size)))
+        if i is None:
+            return None
+
+        points, lengths = self.points, self.lengths
+        for j in (i - 1, i):
+            if not 0 <= j < len(points) - 1:
+                continue
+
+            (x0, y0), (x1, y1) = points[j], points[j + 1]
+            length = lengths[j + 1] - lengths[j]
+
+            # segments are axis-aligned, so this is both the distance along & the length of the projection
+            along = min(max(((x - x0) * (x1 - x0) + (y - y0) * (y1 - y0)) / length, 0), length)
+            if abs(x0 + (x1 - x0) * along / length - x) + abs(y0 + (y1 - y0) * along / length - y) <= 1:
+                return lengths[j] + along
+
+        return None
+
+
+class FlowField:
+    """A path flattened into dense arrays over a rectangle of cells, indexed by integer cell number
+
+    Each cell holds the delta an enemy takes from it (the first of its best deltas, as
+    Path.get_best_delta gives without a previous delta) & its distance from the end point.
+    The arrays support the buffer protocol, so can be read in bulk (i.e. with numpy.frombuffer)
+
+    Attributes:
+        bounds (tuple<int, int, int, int>): The (left, top, width, height) rectangle of cells covered
+        dx (array<int>): The change in column to take from each cell, else 0 if off the path
+        dy (array<int>): The change in row to take from each cell, else 0 if off the path
+        distance (array<int>): The distance of each cell from the end point, else -1 if off the path
+    """
+
+    def __init__(self, path, bounds):
+        """Constructor
+
+        Parameters:
+            path (Path): The path to flatten
+            bounds (tuple<int, int, int, int>): The (left, top, width, height) rectangle of cells to cover
+        """
+        self.bounds = bounds
+        self._left, self._top, self._width, self._height = bounds
+
+        count = self._width * self._height
+        self.dx = array('b', bytes(count))
+        self.dy = array('b', bytes(count))
+        self.distance = array('i', [-1]) * count
+
+        # the same deltas as tuples, to save building them for every lookup
+        self._deltas = [None] * count
+
+        for cell, distance in path.distances.items():
+            index = self.get_index(cell)
+            if index < 0:
+                continue
+
+            self.distance[index] = distance
+            self._deltas[index] = delta = path.get_best_delta(cell)
+            self.dx[index], self.dy[index] = delta
+
+    def get_index(self, cell):
+        """(int) Returns the index of 'cell' in this field's arrays, else -1 if it is out of bounds"""
+        column = cell[0] - self._left
+        row = cell[1] - self._top
+        if 0 <= column < self._width and 0 <= row < self._height:
+            return row * self._width + column
+        return -1
+
+    def __contains__(self, cell):
+        """(bool) Returns True iff 'cell' is on the path"""
+        index = self.get_index(cell)
+        return index >= 0 and self.distance[index] >= 0
+
+    def get_delta(self, cell):
+        """(tuple<int, int>) Returns change in (column, row) position to reach next point on path
+
+        Raises:
+            KeyError if cell is not on the path
+        """
+        column = cell[0] - self._left
+        row = cell[1] - self._top
+        if 0 <= column < self._width and 0 <= row < self._height:
+            delta = self._deltas[row * self._width + column]
+            if delta is not None:
+                return delta
+
+        raise KeyError(cell)
+
+    def get_distance(self, cell):
+        """(int) Returns the distance of 'cell' from the end point, else -1 if it is not on the path"""
+        index = self.get_index(cell)
+        return self.distance[index] if index >= 0 else -1
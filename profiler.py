@@ -0,0 +1,72 @@
+"""
+Lightweight rolling-window profiling of named phases (i.e. parts of a game step)
+"""
+
+from collections import deque
+
+
+class PhaseStats:
+    """Summary statistics of the recent timings of a single phase, in seconds"""
+
+    def __init__(self, mean, p95, maximum, samples):
+        """Constructor
+
+        Parameters:
+            mean (float): The mean time taken
+            p95 (float): The 95th percentile of time taken
+            maximum (float): The longest time taken
+            samples (int): The number of timings summarised
+        """
+        self.mean = mean
+        self.p95 = p95
+        self.max = maximum
+        self.samples = samples
+
+    def __str__(self):
+        """(str) Returns a human readable summary, in milliseconds"""
+        return "mean {:.3f} ms, p95 {:.3f} ms, max {:.3f} ms ({} samples)".format(
+            self.mean * 1000, self.p95 * 1000, self.max * 1000, self.samples)
+
+
+class PhaseProfiler:
+    """Records the most recent timings of each of a fixed set of phases"""
+
+    def __init__(self, phases, window=240):
+        """Constructor
+
+        Parameters:
+            phases (iter<str>): The names of the phases to time
+            window (int): The number of most recent timings to keep per phase
+        """
+        self._timings = {phase: deque(maxlen=window) for phase in phases}
+
+    def get_phases(self):
+        """(tuple<str, ...>) Returns the names of the phases being timed"""
+        return tuple(self._timings)
+
+    def record(self, phase, elapsed):
+        """Records that 'phase' took 'elapsed' seconds"""
+        self._timings[phase].append(elapsed)
+
+    def reset(self):
+        """Discards all recorded timings"""
+        for timings in self._timings.values():
+            timings.clear()
+
+    def get_stats(self, phase):
+        """(PhaseStats) Returns statistics of the recent timings of 'phase', or None if none have been recorded"""
+        timings = sorted(self._timings[phase])
+        if not timings:
+            return None
+
+        p95 = timings[min(len(timings) - 1, int(.95 * len(timings)))]
+        return PhaseStats(sum(timings) / len(timings), p95, timings[-1], len(timings))
+
+    def get_all_stats(self):
+        """(dict<str: PhaseStats>) Returns statistics for every phase with recorded timings"""
+        stats = {}
+        for phase in self._timings:
+            phase_stats = self.get_stats(phase)
+            if phase_stats is not None:
+                stats[phase] = phase_stats
+        return stats
@@ -14,6 +14,26 @@ class AbstractRange:
         """(bool) Returns True iff 'point' exists within this range (from origin)"""
         raise NotImplementedError("contains must be implemented by a subclass")
 
+    def contains_points(self, x, y):
+        """Returns which of many points exist within this range (from origin)
+
+        Subclasses implement this with elementwise operators only, so it can be applied to
+        whole (i.e. numpy) arrays of coordinates at once
+
+        Parameters:
+            x (sequence<num>): The x coordinate of each point
+            y (sequence<num>): The y coordinate of each point
+
+        Return:
+            sequence<bool>: True for each point within this range
+        """
+        return [self.contains(point) for point in zip(x, y)]
+
+    def get_bounds(self):
+        """Returns the axis-aligned bounding box of this range (from origin), as a pair of
+        coordinate pairs: ((left, top), (right, bottom)), else None if the range is unbounded"""
+        return None
+
 
 class CircularRange(AbstractRange):
     """Circular-shaped area range"""
@@ -29,6 +49,17 @@ class CircularRange(AbstractRange):
         """(bool) Returns True iff 'point' exists within this range (from origin)"""
         return vector_length(point) <= self.radius
 
+    def contains_points(self, x, y):
+        """(array<bool>) Returns which of many points, given as arrays of 'x' & 'y' coordinates,
+        exist within this range (from origin)"""
+        return (x ** 2 + y ** 2) ** .5 <= self.radius
+
+    def get_bounds(self):
+        """Returns the axis-aligned bounding box of this range (from origin), as a pair of
+        coordinate pairs: ((left, top), (right, bottom))"""
+        radius = self.radius
+        return (-radius, -radius), (radius, radius)
+
 
 class PlusRange(AbstractRange):
     """Plus-shaped area range"""
@@ -59,6 +90,20 @@ class PlusRange(AbstractRange):
 
         return (-inn < x < inn and -out < y < out) or (-out < x < out and -inn < y < inn)
 
+    def contains_points(self, x, y):
+        """(array<bool>) Returns which of many points, given as arrays of 'x' & 'y' coordinates,
+        exist within this range (from origin)"""
+        inn = self.inner_radius
+        out = self.outer_radius
+
+        return ((-inn < x) & (x < inn) & (-out < y) & (y < out)) | ((-out < x) & (x < out) & (-inn < y) & (y < inn))
+
+    def get_bounds(self):
+        """Returns the axis-aligned bounding box of this range (from origin), as a pair of
+        coordinate pairs: ((left, top), (right, bottom))"""
+        out = self.outer_radius
+        return (-out, -out), (out, out)
+
 
 class DonutRange(AbstractRange):
     """Donut shape area"""
@@ -75,3 +120,15 @@ class DonutRange(AbstractRange):
     def contains(self, point):
         """(bool) Returns True iff 'point' exists within this range (from origin)"""
         return self.inner_radius <= vector_length(point) <= self.outer_radius
+
+    def contains_points(self, x, y):
+        """(array<bool>) Returns which of many points, given as arrays of 'x' & 'y' coordinates,
+        exist within this range (from origin)"""
+        length = (x ** 2 + y ** 2) ** .5
+        return (self.inner_radius <= length) & (length <= self.outer_radius)
+
+    def get_bounds(self):
+        """Returns the axis-aligned bounding box of this range (from origin), as a pair of
+        coordinate pairs: ((left, top), (right, bottom))"""
+        out = self.outer_radius
+        return (-out, -out), (out, out)
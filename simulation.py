@@ -0,0 +1,283 @@
+"""
+Headless simulation runner for tower defence game
+
+Drives a TowerGame to completion at full speed, without a GUI stepper, so
+that tower layouts can be evaluated in bulk (i.e. for balancing levels)
+
+Example:
+    python simulation.py --level AdvancedLevel --waves 1-10 \\
+        --tower 2,2:MissileTower --tower 3,0:SimpleTower
+"""
+
+import argparse
+import time
+
+import custom
+from model import TowerGame
+from tower import AbstractTower, SimpleTower, MissileTower, PulseTower
+from levels import MyLevel, IntermediateLevel, AdvancedLevel
+
+# Levels & towers available by name (i.e. from the command line)
+LEVELS = {
+    'MyLevel': MyLevel,
+    'IntermediateLevel': IntermediateLevel,
+    'AdvancedLevel': AdvancedLevel,
+}
+
+TOWERS = {
+    'SimpleTower': SimpleTower,
+    'MissileTower': MissileTower,
+    'PulseTower': PulseTower,
+    'CustomTower': custom.CustomTower,
+    'AdvancedTower': custom.AdvancedTower,
+}
+
+# The number of waves a tower survives before aging, per level
+# (mirrors TowerGameApp.next_wave)
+TOWER_MAX_AGE = {
+    IntermediateLevel: 15,
+    AdvancedLevel: 10,
+}
+
+STARTING_LIVES = 100
+STARTING_COINS = 200
+
+# Safety net against a wave that can never be cleared
+MAX_STEPS = 1000000
+
+
+class SimulationResult:
+    """The outcome of a single headless simulation"""
+
+    def __init__(self, lives, score, coins, waves, steps, elapsed):
+        """Constructor
+
+        Parameters:
+            lives (int): The number of lives remaining
+            score (int): The final score
+            coins (int): The number of coins at the end of the simulation
+            waves (int): The number of waves that were completed
+            steps (int): The number of game steps that were run
+            elapsed (float): The wall-clock time taken, in seconds
+        """
+        self.lives = lives
+        self.score = score
+        self.coins = coins
+        self.waves = waves
+        self.steps = steps
+        self.elapsed = elapsed
+
+    def is_won(self):
+        """(bool) Returns True iff the player survived the simulation"""
+        return self.lives > 0
+
+    def steps_per_second(self):
+        """(float) Returns the number of game steps run per second of wall-clock time"""
+        if self.elapsed == 0:
+            return float('inf')
+        return self.steps / self.elapsed
+
+    def __str__(self):
+        """(str) Returns a human readable summary of this result"""
+        return "{} after {} wave(s): lives={}, score={}, coins={}, steps={}, {:.0f} steps/s".format(
+            "Won" if self.is_won() else "Lost", self.waves, self.lives, self.score, self.coins,
+            self.steps, self.steps_per_second())
+
+
+class Simulation:
+    """Runs a TowerGame to completion without a GUI
+
+    Scoring, coins & lives follow the same rules as TowerGameApp, with the
+    next wave being sent as soon as the previous one is cleared
+    """
+
+    def __init__(self, level, layout, first_wave=1, last_wave=None, game=None,
+                 lives=STARTING_LIVES, max_steps=MAX_STEPS, targeting=None):
+        """Constructor
+
+        Parameters:
+            level (AbstractLevel): The level to generate waves from
+            layout (iter<tuple<tuple<int, int>, Class<AbstractTower>>>):
+                (cell, tower_class) pairs of the towers to place before the first wave
+            first_wave (int): The first wave to send
+            last_wave (int): The last wave to send, or None for the level's final wave
+            game (TowerGame): The game to simulate, or None to create a default game
+            lives (int): The number of lives to start with
+            max_steps (int): The maximum number of steps to run before giving up
+            targeting (str): The targeting policy of every tower in the layout
+                             (see AbstractTower.set_targeting), or None for the default
+
+        Raises:
+            ValueError if a tower in the layout can not be placed
+        """
+        if last_wave is None:
+            last_wave = level.get_max_wave()
+
+        self._level = level
+        self._first_wave = first_wave
+        self._last_wave = last_wave
+        self._max_steps = max_steps
+
+        self._game = game if game is not None else TowerGame()
+
+        self._lives = lives
+        self._score = 0
+        self._coins = STARTING_COINS
+
+        self._game.on("enemy_death", self._handle_death)
+        self._game.on("enemy_escape", self._handle_escape)
+
+        for cell, tower_class in layout:
+            if not self._game.place(cell, tower_type=tower_class):
+                raise ValueError(f"Cannot place {tower_class.__name__} at {cell}")
+
+            tower = self._game.towers[cell]
+            tower.my_wave = first_wave
+            tower.set_targeting(targeting)
+            self._coins -= tower.get_value()
+
+    def get_game(self):
+        """(TowerGame) Returns the game being simulated"""
+        return self._game
+
+    def _handle_death(self, enemies):
+        """Handles enemies dying (see TowerGameApp._handle_death)"""
+        bonus = len(enemies) ** .5
+        for enemy in enemies:
+            self._coins += enemy.points
+            self._score += int(enemy.points * bonus)
+
+    def _handle_escape(self, enemies):
+        """Handles enemies escaping (see TowerGameApp._handle_escape)"""
+        self._lives = max(0, self._lives - len(enemies))
+
+    def _age_towers(self, wave):
+        """Ages towers that have survived too many waves (see TowerGameApp.next_wave)"""
+        max_age = TOWER_MAX_AGE.get(type(self._level))
+        if max_age is None:
+            return
+
+        for tower in self._game.towers.values():
+            if wave - tower.my_wave >= max_age:
+                tower.tower_aging()
+
+    def _queue_wave(self, wave):
+        """Generates the 'wave'th wave and queues it in the game"""
+        self._age_towers(wave)
+
+        enemies = self._level.get_wave(wave)
+        for _, enemy in enemies:
+            enemy.set_cell_size(self._game.grid.cell_size)
+
+        self._game.queue_wave(enemies)
+
+    def run(self):
+        """(SimulationResult) Runs the simulation until the last wave is cleared or all lives are lost"""
+        game = self._game
+        steps = 0
+        waves = 0
+
+        start = time.perf_counter()
+
+        for wave in range(self._first_wave, self._last_wave + 1):
+            self._queue_wave(wave)
+
+            while not game.is_wave_over() and self._lives > 0 and steps < self._max_steps:
+                game.step()
+                steps += 1
+
+            if self._lives == 0 or steps >= self._max_steps:
+                break
+
+            waves += 1
+
+        elapsed = time.perf_counter() - start
+
+        return SimulationResult(self._lives, self._score, self._coins, waves, steps, elapsed)
+
+
+def parse_tower(argument):
+    """(tuple<tuple<int, int>, Class<AbstractTower>>) Parses a 'column,row:TowerName' argument"""
+    try:
+        cell, name = argument.split(':')
+        column, row = (int(i) for i in cell.split(','))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"Expected column,row:TowerName, got {argument!r}") from error
+
+    if name not in TOWERS:
+        raise argparse.ArgumentTypeError(f"Unknown tower {name!r}; expected one of {', '.join(TOWERS)}")
+
+    return (column, row), TOWERS[name]
+
+
+def parse_waves(argument):
+    """(tuple<int, int|None>) Parses a 'first-last', 'first-' or 'wave' argument"""
+    first, separator, last = argument.partition('-')
+    try:
+        first = int(first)
+        if not separator:
+            last = first
+        else:
+            last = int(last) if last else None
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"Expected first-last, got {argument!r}") from error
+
+    return first, last
+
+
+def main(argv=None):
+    """Runs a headless simulation from command line arguments"""
+    parser = argparse.ArgumentParser(description="Run a tower defence game headlessly")
+    parser.add_argument('--level', choices=LEVELS, default='MyLevel',
+                        help="The level to play")
+    parser.add_argument('--tower', type=parse_tower, action='append', default=[], dest='towers',
+                        help="A tower to place, as column,row:TowerName (repeatable)")
+    parser.add_argument('--waves', type=parse_waves, default=(1, None),
+                        help="The waves to play, as first-last (default: all waves)")
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS,
+                        help="The maximum number of steps to simulate")
+    parser.add_argument('--targeting', choices=AbstractTower.TARGETING_POLICIES,
+                        help="How towers choose between enemies in range (default: first found)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print timings for each phase of a game step")
+    parser.add_argument('--adaptive-buckets', action='store_true',
+                        help="Size enemy buckets adaptively rather than using a fixed 10x10")
+    parser.add_argument('--enemy-store', action='store_true',
+                        help="Find tower targets with vectorised queries (requires numpy)")
+    parser.add_argument('--path-backend', choices=TowerGame.PATH_BACKENDS, default='dict',
+                        help="How paths are generated from scratch")
+    parser.add_argument('--flow-field', action='store_true',
+                        help="Move enemies through a dense flow field rather than the path's dicts")
+    parser.add_argument('--arc-length', action='store_true',
+                        help="Move enemies by distance along the best path, rather than cell by cell")
+    parser.add_argument('--projectile-pool', action='store_true',
+                        help="Reuse expired missiles & pulses for new ones")
+    parser.add_argument('--tower-scheduler', action='store_true',
+                        help="Only step towers when they may do more than cool down")
+    args = parser.parse_args(argv)
+
+    game = TowerGame(adaptive_buckets=args.adaptive_buckets, enemy_store=args.enemy_store,
+                     path_backend=args.path_backend, flow_field=args.flow_field,
+                     arc_length=args.arc_length, projectile_pool=args.projectile_pool,
+                     tower_scheduler=args.tower_scheduler)
+
+    first_wave, last_wave = args.waves
+
+    try:
+        simulation = Simulation(LEVELS[args.level](), args.towers, first_wave=first_wave,
+                                last_wave=last_wave, game=game, max_steps=args.max_steps,
+                                targeting=args.targeting)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.profile:
+        simulation.get_game().enable_profiling()
+
+    print(simulation.run())
+
+    for phase, stats in simulation.get_game().get_profile_stats().items():
+        print("  {:<14} {}".format(phase, stats))
+
+
+if __name__ == "__main__":
+    main()
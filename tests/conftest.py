@@ -0,0 +1,9 @@
+"""
+Makes the game's modules importable by the tests, which are run from the project root:
+    python -m pytest
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+"""
+Small random grids, with start & end just outside either side (as in TowerGame), for the path tests
+"""
+
+import random
+
+from modules.matrix import get_adjacent_cells
+
+
+def make_get_neighbours(size, blocked, start, end):
+    """Returns a function yielding the neighbours of a cell, avoiding 'blocked' cells
+    (as TowerGame._make_get_neighbours)"""
+    columns, rows = size
+
+    def get_neighbours(cell, from_=True):  # pylint: disable=unused-argument
+        """Yields all the positions neighbouring cell"""
+        for node in get_adjacent_cells(cell):
+            if (0 <= node[0] < columns and 0 <= node[1] < rows and node not in blocked) \
+                    or node == start or node == end:
+                yield node
+
+    return get_neighbours
+
+
+def random_grids(seed, count, max_size=7):
+    """Yields (rng, size, start, end) tuples for 'count' random grids, where rng is the random
+    generator (seeded with 'seed') that made the grid, for choosing the cells to block"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        size = columns, rows = rng.randint(2, max_size), rng.randint(2, max_size)
+        yield rng, size, (-1, rng.randrange(rows)), (columns, rng.randrange(rows))
+
+
+def get_cells(size):
+    """(list<tuple<int, int>>) Returns every cell of a grid of 'size', column by column"""
+    columns, rows = size
+    return [(column, row) for column in range(columns) for row in range(rows)]
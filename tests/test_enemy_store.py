@@ -0,0 +1,192 @@
+"""
+Tests the batched queries of an EnemyStore against the per-unit queries they replace
+"""
+
+import random
+
+import pytest
+
+from core import UnitManager
+from enemy import SimpleEnemy
+from enemy_store import EnemyStore
+from model import TowerGame
+from tower import SimpleTower, MissileTower, PulseTower, Pulse
+
+CELL_SIZE = 60
+GRID_SIZE = (10, 8)
+PIXELS = tuple(CELL_SIZE * cells for cells in GRID_SIZE)
+
+
+def make_enemies(rng, count):
+    """(list<SimpleEnemy>) Returns 'count' enemies of random sizes, scattered over (& just beyond) the grid"""
+    width, height = PIXELS
+
+    enemies = []
+    for _ in range(count):
+        enemy = SimpleEnemy(grid_size=(rng.choice((.2, .3, .5)),) * 2)
+        enemy.set_cell_size(CELL_SIZE)
+        enemy.position = rng.uniform(-30, width + 30), rng.uniform(-30, height + 30)
+        enemies.append(enemy)
+
+    return enemies
+
+
+def copy_enemies(enemies):
+    """(list<SimpleEnemy>) Returns a copy of each of 'enemies', of the same size & position"""
+    copies = []
+    for enemy in enemies:
+        copy = SimpleEnemy(grid_size=enemy.grid_size)
+        copy.set_cell_size(CELL_SIZE)
+        copy.position = enemy.position
+        copies.append(copy)
+
+    return copies
+
+
+def make_manager(enemies):
+    """(UnitManager) Returns a manager bucketing 'enemies', as kept by a TowerGame"""
+    manager = UnitManager(PIXELS)
+    for enemy in enemies:
+        manager.update_unit(enemy)
+    return manager
+
+
+def make_store(enemies):
+    """(EnemyStore) Returns a store of 'enemies', as kept by a TowerGame"""
+    store = EnemyStore(PIXELS)
+    store.sync(enemies)
+    return store
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_get_all_in_range(seed):
+    """Finds the same enemies in-range of each tower as it does itself, in store order"""
+    rng = random.Random(seed)
+    enemies = make_enemies(rng, rng.randint(0, 300))
+
+    manager = make_manager(enemies)
+    store = make_store(enemies)
+
+    towers = []
+    for _ in range(rng.randint(1, 30)):
+        tower = rng.choice((SimpleTower, MissileTower, PulseTower))(CELL_SIZE)
+        tower.position = rng.uniform(0, PIXELS[0]), rng.uniform(0, PIXELS[1])
+        towers.append(tower)
+
+    in_range = store.get_all_in_range(towers)
+
+    assert set(in_range) == set(towers)
+    for tower in towers:
+        expected = set(tower.get_units_in_range(manager))
+        assert in_range[tower] == [enemy for enemy in enemies if enemy in expected]
+
+
+class Units:
+    """The units a pulse steps among"""
+
+    def __init__(self, enemies):
+        self.enemies = enemies
+
+
+@pytest.mark.parametrize('hits', (0, 3))
+@pytest.mark.parametrize('seed', range(10))
+def test_get_all_in_boxes(seed, hits):
+    """Pulses given the enemies in their swept boxes hit the same enemies as pulses searching the buckets"""
+    rng = random.Random(seed)
+    enemies = make_enemies(rng, rng.randint(0, 300))
+    copies = copy_enemies(enemies)
+    units = Units(make_manager(enemies))
+    store = make_store(copies)
+
+    # pairs of identical pulses, the first searching the buckets & the second given its collisions
+    pairs = []
+    for _ in range(rng.randint(1, 50)):
+        position = rng.uniform(0, PIXELS[0]), rng.uniform(0, PIXELS[1])
+        direction = rng.choice(Pulse.DIRECTIONS)
+        grid_speed = rng.choice((.15, 1, 3))
+        pairs.append(tuple(Pulse(position, CELL_SIZE, direction, grid_speed=grid_speed, hits=hits)
+                           for _ in range(2)))
+
+    for _ in range(20):
+        given = [pulse for _, pulse in pairs]
+        boxes = [pulse.get_swept_box() for pulse in given]
+        for pulse, collisions in zip(given, store.get_all_in_boxes(boxes, units.enemies.get_bucket_size())):
+            pulse.collisions = collisions
+
+        persisting = []
+        for first, second in pairs:
+            persist, _ = first.step(units)
+            assert second.step(units) == (persist, None)
+            assert first.position == second.position
+
+            damaged = [enemy in first._damaged for enemy in enemies]  # pylint: disable=protected-access
+            copies_damaged = [copy in second._damaged for copy in copies]  # pylint: disable=protected-access
+            if persist or not hits:
+                assert damaged == copies_damaged
+                persisting.append((first, second))
+            else:
+                # buckets & the store yield enemies in different orders, so the last step of a
+                # pulse reaching its limit can hit different (but as many) enemies
+                assert sum(damaged) == sum(copies_damaged)
+
+        if not hits:
+            assert [enemy.health for enemy in enemies] == [copy.health for copy in copies]
+
+        pairs = persisting
+
+
+def make_game_data(rng):
+    """(GameData) Returns the data of a game moving enemies by arc-length, around random towers"""
+    game = TowerGame(size=GRID_SIZE, cell_size=CELL_SIZE, arc_length=True)
+    columns, rows = GRID_SIZE
+    for _ in range(15):
+        game.place((rng.randrange(columns), rng.randrange(rows)), SimpleTower)
+
+    return game._data  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_advance(seed):
+    """Moves enemies along the polyline as stepping each in turn would, reading speeds
+    & health changed between steps"""
+    rng = random.Random(seed)
+    data = make_game_data(rng)
+    polyline = data.polyline
+
+    # pairs of identical enemies, the first stepped in turn & the second advanced in the store
+    pairs = []
+    for _ in range(rng.randint(1, 100)):
+        speed = rng.choice((2/60, 5/60, 9/60))
+        position = polyline.get_position(rng.uniform(0, polyline.length))
+        pair = SimpleEnemy(grid_speed=speed), SimpleEnemy(grid_speed=speed)
+        for enemy in pair:
+            enemy.set_cell_size(CELL_SIZE)
+            enemy.position = position
+        pairs.append(pair)
+
+    store = make_store(enemy for _, enemy in pairs)
+
+    for _ in range(200):
+        # as towers slow & kill enemies between steps
+        for pair in rng.sample(pairs, len(pairs) // 10):
+            speed = pair[0].grid_speed * rng.choice((.5, 2))
+            health = rng.choice((0, pair[0].health))
+            for enemy in pair:
+                enemy.grid_speed = speed
+                enemy.health = health
+
+        expected_dead = [i for i, (enemy, _) in enumerate(pairs) if enemy.is_dead()]
+        expected_escaped = [i for i, (enemy, _) in enumerate(pairs) if not enemy.is_dead() and not enemy.step(data)]
+
+        dead, escaped, stranded = store.advance(polyline)
+        assert (dead, escaped, stranded) == (expected_dead, expected_escaped, [])
+
+        for stepped, advanced in pairs:
+            if stepped.is_dead():
+                continue
+            assert advanced.travelled == pytest.approx(stepped.travelled, abs=1e-9)
+            assert advanced.position == pytest.approx(stepped.position, abs=1e-9)
+
+        removed = set(dead + escaped)
+        store.remove(sorted(removed))
+        pairs = [pair for i, pair in enumerate(pairs) if i not in removed]
@@ -0,0 +1,83 @@
+"""
+Tests HierarchicalPath against Path, on small random grids split into small clusters
+"""
+
+import pytest
+
+from hierarchical_path import HierarchicalPath
+from path import Path
+
+from grids import make_get_neighbours, random_grids, get_cells
+
+CLUSTER_SIZE = 2
+
+
+def make_path(path_class, size, start, end, blocked):
+    """(Path) Returns a path of 'path_class' through a grid of 'size', else None if the end can't be reached"""
+    get_neighbours = make_get_neighbours(size, blocked, start, end)
+    try:
+        if path_class is HierarchicalPath:
+            return HierarchicalPath(start, end, get_neighbours, size, blocked, cluster_size=CLUSTER_SIZE)
+        return Path(start, end, get_neighbours)
+    except KeyError:
+        return None
+
+
+def assert_paths_equal(path, expected):
+    """Asserts that the distances, deltas & best path of 'path' equal those of 'expected'"""
+    assert dict(path.distances) == dict(expected.distances)
+    assert dict(path.deltas) == dict(expected.deltas)
+    assert list(path.get_best_path()) == list(expected.get_best_path())
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_reaches_end_iff_path_does(seed):
+    """The end can be reached exactly when it can by Path, following the best delta from any cell"""
+    for rng, size, start, end in random_grids(seed, 40):
+        blocked = {cell for cell in get_cells(size) if rng.random() < .35}
+
+        path = make_path(HierarchicalPath, size, start, end, blocked)
+        assert (path is None) == (make_path(Path, size, start, end, blocked) is None)
+        if path is None:
+            continue
+
+        cells = list(path.distances)
+        assert start in cells
+        for cell in cells:
+            previous = None
+            for _ in range(len(cells)):
+                if cell == end:
+                    break
+                previous = path.get_best_delta(cell, previous)
+                cell = tuple(a + b for a, b in zip(cell, previous))
+                assert cell in path.distances
+            assert cell == end
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_repair_matches_fresh_path(seed):
+    """Repeatedly blocking & unblocking cells leaves the same path as generating it afresh"""
+    for rng, size, start, end in random_grids(seed, 10):
+        cells = get_cells(size)
+        blocked = set()
+        path = make_path(HierarchicalPath, size, start, end, blocked)
+
+        for _ in range(30):
+            cell = rng.choice(cells)
+            repaired = path.copy()
+
+            if cell in blocked:
+                blocked.remove(cell)
+                repaired.unblock((cell,), make_get_neighbours(size, blocked, start, end))
+            else:
+                blocked.add(cell)
+                fresh = make_path(HierarchicalPath, size, start, end, blocked)
+                if fresh is None:
+                    with pytest.raises(KeyError, match="Cannot reach end from start"):
+                        repaired.block((cell,), make_get_neighbours(size, blocked, start, end))
+                    blocked.remove(cell)
+                    continue
+                repaired.block((cell,), make_get_neighbours(size, blocked, start, end))
+
+            assert_paths_equal(repaired, make_path(HierarchicalPath, size, start, end, blocked))
+            path = repaired
@@ -0,0 +1,68 @@
+"""
+Tests stepping missiles together against stepping each in turn
+"""
+
+import random
+
+import pytest
+
+from enemy import SimpleEnemy
+from missile_batch import can_batch, step_missiles
+from tower import Missile
+
+CELL_SIZE = 60
+
+
+def make_targets(rng, count):
+    """(list<tuple<SimpleEnemy, SimpleEnemy>>) Returns 'count' pairs of identical targets,
+    each killed by one to three missiles"""
+    pairs = []
+    for _ in range(count):
+        position = rng.uniform(0, 600), rng.uniform(0, 400)
+        health = rng.choice((10, 20, 30))
+
+        pair = SimpleEnemy(health=health), SimpleEnemy(health=health)
+        for target in pair:
+            target.set_cell_size(CELL_SIZE)
+            target.position = position
+        pairs.append(pair)
+
+    return pairs
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_step_missiles(seed):
+    """Missiles stepped together move, hit & expire as stepping each in turn would, including
+    missiles whose target is killed by an earlier missile in the same step"""
+    rng = random.Random(seed)
+    targets = make_targets(rng, rng.randint(1, 10))
+
+    # pairs of identical missiles, the first stepped in turn & the second stepped together,
+    # crowded around few targets so that many reach the same target in the same step
+    pairs = []
+    for _ in range(rng.randint(1, 200)):
+        first_target, second_target = rng.choice(targets)
+        x, y = first_target.position
+        position = x + rng.uniform(-100, 100), y + rng.uniform(-100, 100)
+        rotation = rng.uniform(-3, 3)
+        grid_speed = rng.choice((.1, .3, 1))
+
+        pairs.append((Missile(position, CELL_SIZE, first_target, rotation=rotation, grid_speed=grid_speed),
+                      Missile(position, CELL_SIZE, second_target, rotation=rotation, grid_speed=grid_speed)))
+
+    assert all(can_batch(second) for _, second in pairs)
+
+    while pairs:
+        # as targets are killed by other towers between steps
+        for first_target, second_target in rng.sample(targets, len(targets) // 5):
+            first_target.health = second_target.health = 0
+
+        expected = [first.step(None)[0] for first, _ in pairs]
+        assert step_missiles([second for _, second in pairs]) == expected
+
+        for first, second in pairs:
+            assert second.position == pytest.approx(first.position, abs=1e-9)
+            assert second.rotation == pytest.approx(first.rotation, abs=1e-9)
+        assert [first.health for first, _ in targets] == [second.health for _, second in targets]
+
+        pairs = [pair for pair, persist in zip(pairs, expected) if persist]
@@ -0,0 +1,31 @@
+"""
+Tests checking placements in a TowerGame against placing towers
+"""
+
+import random
+
+import pytest
+
+from model import TowerGame
+from tower import SimpleTower
+
+
+@pytest.mark.parametrize('path_backend', TowerGame.PATH_BACKENDS)
+@pytest.mark.parametrize('seed', range(5))
+def test_attempt_placement_agrees_with_place(seed, path_backend):
+    """A tower can be placed at exactly the cells attempt_placement finds legal, giving the same path"""
+    rng = random.Random(seed)
+    size = columns, rows = rng.randint(2, 6), rng.randint(2, 6)
+    game = TowerGame(size=size, cell_size=10, path_backend=path_backend)
+    cells = [(column, row) for column in range(columns) for row in range(rows)]
+
+    for _ in range(columns * rows // 2):
+        game.place(rng.choice(cells), SimpleTower)
+
+        for cell in cells:
+            legal, path = game.attempt_placement(game.grid.cell_to_pixel_centre(cell))
+            assert game.place(cell, SimpleTower) == legal
+
+            if legal:
+                assert list(game.path.get_best_path()) == list(path.get_best_path())
+                game.remove(cell)
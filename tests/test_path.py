@@ -0,0 +1,78 @@
+"""
+Tests repairing a Path as cells are blocked & unblocked against generating it afresh
+"""
+
+import pytest
+
+from path import Path
+
+from grids import make_get_neighbours, random_grids, get_cells
+
+
+def assert_paths_equal(path, expected):
+    """Asserts that the distances, deltas (including the order of each cell's deltas)
+    & best path of 'path' equal those of 'expected'"""
+    assert path.distances == expected.distances
+    assert {cell: list(deltas) for cell, deltas in path.deltas.items()} == \
+        {cell: list(deltas) for cell, deltas in expected.deltas.items()}
+    assert list(path.get_best_path()) == list(expected.get_best_path())
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_repair_matches_fresh_path(seed):
+    """Repeatedly blocking & unblocking random cells leaves the same path as generating it afresh,
+    or raises the same error when the end can't be reached"""
+    for rng, size, start, end in random_grids(seed, 10):
+        cells = get_cells(size)
+        blocked = set()
+        path = Path(start, end, make_get_neighbours(size, blocked, start, end))
+
+        for _ in range(40):
+            # sometimes several cells at once, all either blocked or unblocked
+            changed = set(rng.sample(cells, rng.choice((1, 1, 1, 2, 3))))
+            unblocking = changed <= blocked
+            if not unblocking:
+                changed -= blocked
+
+            new_blocked = blocked - changed if unblocking else blocked | changed
+            get_neighbours = make_get_neighbours(size, new_blocked, start, end)
+            repaired = path.copy()
+
+            try:
+                fresh = Path(start, end, get_neighbours)
+            except KeyError as error:
+                assert error.args == ("Cannot reach end from start",)
+                with pytest.raises(KeyError, match="Cannot reach end from start"):
+                    repaired.block(changed, get_neighbours)
+                continue
+
+            if unblocking:
+                repaired.unblock(changed, get_neighbours)
+            else:
+                repaired.block(changed, get_neighbours)
+
+            assert_paths_equal(repaired, fresh)
+            path, blocked = repaired, new_blocked
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_separators_disconnect_path(seed):
+    """Exactly the separators of a path disconnect its start from its end when blocked"""
+    for rng, size, start, end in random_grids(seed, 20):
+        blocked = {cell for cell in get_cells(size) if rng.random() < .3}
+        try:
+            path = Path(start, end, make_get_neighbours(size, blocked, start, end))
+        except KeyError:
+            continue
+
+        separators = path.get_separators()
+        for cell in get_cells(size):
+            if cell in blocked:
+                continue
+
+            try:
+                Path(start, end, make_get_neighbours(size, blocked | {cell}, start, end))
+            except KeyError:
+                assert cell in separators
+            else:
+                assert cell not in separators
@@ -0,0 +1,43 @@
+"""
+Tests games stepping only the towers a TowerScheduler wakes against games stepping every tower
+"""
+
+import pytest
+
+from levels import MyLevel, AdvancedLevel
+from model import TowerGame
+from simulation import Simulation
+from tower import SimpleTower, MissileTower, PulseTower
+
+LAYOUT = [((2, 2), MissileTower), ((3, 0), SimpleTower), ((1, 2), PulseTower)]
+WAVES = 5
+
+
+def get_state(simulation):
+    """Returns the lives, coins & health of every enemy of a simulation"""
+    # pylint: disable=protected-access
+    return simulation._lives, simulation._coins, [enemy.health for enemy in simulation.get_game().enemies]
+
+
+@pytest.mark.parametrize('level_class', (MyLevel, AdvancedLevel))
+def test_scheduled_towers_match_every_tower(level_class):
+    """Stepping only the towers awake plays out exactly as stepping every tower, step by step"""
+    scheduled, every = simulations = [
+        Simulation(level_class(), LAYOUT, last_wave=WAVES, game=TowerGame(tower_scheduler=tower_scheduler),
+                   targeting='first') for tower_scheduler in (True, False)]
+
+    slept = False
+    for wave in range(1, WAVES + 1):
+        for simulation in simulations:
+            simulation._queue_wave(wave)  # pylint: disable=protected-access
+
+        while not scheduled.get_game().is_wave_over() or not every.get_game().is_wave_over():
+            for simulation in simulations:
+                simulation.get_game().step()
+
+            assert get_state(scheduled) == get_state(every)
+
+            game = scheduled.get_game()
+            slept |= len(game._tower_scheduler) < len(game.towers)  # pylint: disable=protected-access
+
+    assert slept
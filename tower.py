@@ -7,7 +7,7 @@ All towers should inherit from AbstractTower (either directly or from one of its
 import math
 from typing import Union
 
-from core import Unit, Point2D, UnitManager
+from core import Unit, Point2D, UnitManager, scale_to_cell
 from enemy import AbstractEnemy
 from range_ import AbstractRange, CircularRange, PlusRange, DonutRange
 from utilities import Countdown, euclidean_distance, rotate_toward, angle_between, polar_to_rectangular, \
@@ -38,6 +38,20 @@ class AbstractTower(Unit):
     # (only in intermediate or advanced level)
     my_wave: int
 
+    # enemies already found to be in-range by a batched query for this step
+    # (see TowerGame._step_towers), else None to search for them
+    enemies_in_range = None
+
+    # how to choose between enemies in-range (one of TARGETING_POLICIES),
+    # else None to take whichever is found first
+    targeting = None
+
+    # the number of steps after its last step in which this tower will do nothing but cool down,
+    # or math.inf if it will do so until an enemy enters its range (see tower_scheduler)
+    idle_steps = 0
+
+    TARGETING_POLICIES = ('first', 'last', 'strongest', 'closest')
+
     def __init__(self, cell_size: int, grid_size=(.9, .9), rotation=math.pi * .25, base_damage=1, level: int = 1):
         super().__init__(None, grid_size, cell_size)
 
@@ -50,6 +64,20 @@ class AbstractTower(Unit):
         self.level = level
         self.my_wave = 100  # initialize the wave
 
+    @staticmethod
+    def create_obstacle(data, obstacle_class, *args, **kwargs):
+        """(AbstractObstacle) Returns a new obstacle of 'obstacle_class', constructed with 'args' &
+        'kwargs', recycled from the game's projectile pool if it has one (see ProjectilePool)
+
+        Parameters:
+            data (GameData): The game's data
+            obstacle_class (Class<AbstractObstacle>): The type of obstacle to create
+        """
+        pool = data.projectile_pool
+        if pool is None:
+            return obstacle_class(*args, **kwargs)
+        return pool.create(obstacle_class, *args, **kwargs)
+
     def get_damage(self):
         """(int) Returns the amount of damage this tower can deal"""
         return self.level * self.base_damage
@@ -64,29 +92,52 @@ class AbstractTower(Unit):
 
         return self.range.contains(tuple(point))
 
+    def get_range_box(self):
+        """Returns the pixel bounding box of this tower's range, as a pair of coordinate pairs:
+        ((left, top), (right, bottom)), else None if the range is unbounded"""
+        bounds = self.range.get_bounds()
+        if bounds is None:
+            return None
+
+        x, y = self.position
+        (left, top), (right, bottom) = bounds
+        cell_size = self.cell_size
+
+        return (x + left * cell_size, y + top * cell_size), (x + right * cell_size, y + bottom * cell_size)
+
     def step(self, data):
         """Performs time step for tower
         Generally, time step involves attacking choice of target(s) from 'units.enemies'
         """
 
+    def skip_steps(self, steps):
+        """Catches this tower up on 'steps' steps it was not stepped for, while idle (see idle_steps)"""
+        self.cool_down.step(steps)
+
     def get_units_in_range(self, enemies: UnitManager, limit=0):
         """(AbstractEnemy) Yields enemies that are in-range of this tower
         
         Parameters:
             enemies (UnitManager): All enemies in the game
+            limit (int): The maximum number of enemies to yield, else 0 for no limit
             
         Note:
-            For efficiency, method could be extended to first convert to potentially
-            valid buckets, and only search those rather than iterating through every enemy.
+            Only buckets overlapping this tower's range box are searched, in rings outward
+            from this tower, so a small 'limit' stops as soon as enough nearby enemies are found.
         """
 
+        if self.enemies_in_range is not None:
+            in_range = self.enemies_in_range
+        else:
+            in_range = (enemy for enemy in enemies.get_closish(self.position, bounds=self.get_range_box())
+                        if self.is_position_in_range(enemy.position))
+
         count = 0
-        for enemy in enemies.get_closish(self.position):
-            if self.is_position_in_range(enemy.position):
-                yield enemy
-                count += 1
-                if limit == count:
-                    break
+        for enemy in in_range:
+            yield enemy
+            count += 1
+            if limit == count:
+                break
 
     def get_unit_in_range(self, units) -> Union[AbstractEnemy, None]:
         """(AbstractEnemy) Returns an enemy that is in-range of this tower, else None if no
@@ -98,7 +149,53 @@ class AbstractTower(Unit):
 
         return None
 
-    def _get_target(self, units) -> Union[AbstractEnemy, None]:
+    def set_targeting(self, targeting):
+        """Sets how this tower chooses between enemies in-range
+
+        Parameters:
+            targeting (str): One of TARGETING_POLICIES:
+                                - first: the enemy with the least distance left along the path
+                                - last: the enemy with the most distance left along the path
+                                - strongest: the enemy with the most health
+                                - closest: the enemy closest to this tower
+                             else None to take whichever enemy is found first
+
+        Raises:
+            ValueError if targeting is not a known policy
+        """
+        if targeting is not None and targeting not in self.TARGETING_POLICIES:
+            raise ValueError(f"Unknown targeting {targeting!r}; expected one of {', '.join(self.TARGETING_POLICIES)}")
+
+        self.targeting = targeting
+
+    def _get_targeting_key(self, data):
+        """Returns a function of an enemy that is least for the enemy this tower's targeting prefers"""
+        if self.targeting in ('first', 'last'):
+            sign = 1 if self.targeting == 'first' else -1
+            return lambda enemy: sign * enemy.get_distance_remaining(data)
+
+        if self.targeting == 'strongest':
+            return lambda enemy: -enemy.health
+
+        x, y = self.position
+        return lambda enemy: (enemy.position[0] - x) ** 2 + (enemy.position[1] - y) ** 2
+
+    def get_target(self, data) -> Union[AbstractEnemy, None]:
+        """Returns the enemy in-range of this tower that its targeting prefers, else None if no
+        enemy is in range
+
+        Only enemies in-range are considered (see get_units_in_range), so choosing a target costs
+        time proportional to the number of enemies near this tower, rather than in the game
+
+        Parameters:
+            data (GameData): The game's data (enemies, grid & path)
+        """
+        if self.targeting is None:
+            return self.get_unit_in_range(data.enemies)
+
+        return min(self.get_units_in_range(data.enemies), key=self._get_targeting_key(data), default=None)
+
+    def _get_target(self, data) -> Union[AbstractEnemy, None]:
         """Returns previous target, else selects new one if previous is invalid
         
         Invalid target is one of:
@@ -113,7 +210,7 @@ class AbstractTower(Unit):
         if self._target is None \
                 or self._target.is_dead() \
                 or not self.is_position_in_range(self._target.position):
-            self._target = self.get_unit_in_range(units)
+            self._target = self.get_target(data)
 
         return self._target
 
@@ -144,11 +241,14 @@ class SimpleTower(AbstractTower):
         """Rotates toward 'target' and attacks if possible"""
         self.cool_down.step()
 
-        target = self.get_unit_in_range(data.enemies)
+        target = self.get_target(data)
 
         if target is None:
+            self.idle_steps = math.inf
             return
 
+        self.idle_steps = 0
+
         angle = angle_between(self.position, target.position)
         partial_angle = rotate_toward(self.rotation, angle, self.rotation_threshold)
         self.rotation = partial_angle
@@ -159,12 +259,24 @@ class SimpleTower(AbstractTower):
 
 class AbstractObstacle(Unit):
     """An obstacle created by a tower"""
-    speed = None
+    __slots__ = ['grid_speed', 'speed', 'rotation', 'damage']
 
     def __init__(self, position, grid_size, cell_size, grid_speed: Union[int, float] = 0, rotation=0, damage=0):
+        # pylint: disable=super-init-not-called
+        # initialised by reset, as expired obstacles are reinitialised (see ProjectilePool)
+        AbstractObstacle.reset(self, position, grid_size, cell_size, grid_speed, rotation, damage)
+
+    def reset(self, position, grid_size, cell_size, grid_speed: Union[int, float] = 0, rotation=0, damage=0):
+        """Reinitialises this obstacle, once it has been released, as if constructed with the same
+        parameters (see ProjectilePool)
+
+        Subclasses should override this to take the same parameters as their constructor
+        """
         self.grid_speed = grid_speed
 
-        super().__init__(position, grid_size, cell_size)
+        self.position = position
+        self.grid_size = grid_size
+        self.set_cell_size(cell_size)
 
         self.rotation = rotation
         self.damage = damage
@@ -172,7 +284,11 @@ class AbstractObstacle(Unit):
     def set_cell_size(self, cell_size: int):
         """Sets the cell size for this unit to 'cell_size'"""
         super().set_cell_size(cell_size)
-        self.speed = cell_size * self.grid_speed
+        self.speed = scale_to_cell(self.grid_speed, cell_size)
+
+    def release(self):
+        """Drops this obstacle's references to other units, once it has expired, so that it
+        can be kept for reuse (see ProjectilePool)"""
 
     def step(self, units):
         """Performs a time step for this obstacle
@@ -190,6 +306,8 @@ class AbstractObstacle(Unit):
 
 class Missile(AbstractObstacle):
     """A simple projectile fired from a MissileTower"""
+    __slots__ = ['target']
+
     name = "Missile"
     colour = '#F5F0E5'  # Eburnean
 
@@ -197,9 +315,19 @@ class Missile(AbstractObstacle):
 
     def __init__(self, position, cell_size, target: AbstractEnemy, size=.2,
                  rotation: Union[int, float] = 0, grid_speed=.1, damage=10):
-        super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
+        # pylint: disable=super-init-not-called
+        Missile.reset(self, position, cell_size, target, size, rotation, grid_speed, damage)
+
+    def reset(self, position, cell_size, target: AbstractEnemy, size=.2,
+              rotation: Union[int, float] = 0, grid_speed=.1, damage=10):
+        """Reinitialises this missile (see AbstractObstacle.reset)"""
+        super().reset(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
         self.target = target
 
+    def release(self):
+        """Drops this missile's target, once it has expired (see AbstractObstacle.release)"""
+        self.target = None
+
     def step(self, units):
         """Performs a time step for this missile
         
@@ -254,7 +382,7 @@ class MissileTower(SimpleTower):
 
         self._target: AbstractEnemy = None
 
-    def _get_target(self, units) -> Union[AbstractEnemy, None]:
+    def _get_target(self, data) -> Union[AbstractEnemy, None]:
         """Returns previous target, else selects new one if previous is invalid
         
         Invalid target is one of:
@@ -269,7 +397,7 @@ class MissileTower(SimpleTower):
         if self._target is None \
                 or self._target.is_dead() \
                 or not self.is_position_in_range(self._target.position):
-            self._target = self.get_unit_in_range(units)
+            self._target = self.get_target(data)
 
         return self._target
 
@@ -277,11 +405,15 @@ class MissileTower(SimpleTower):
         """Rotates toward 'target' and fires missile if possible"""
         self.cool_down.step()
 
-        target = self._get_target(units.enemies)
+        target = self._get_target(units)
 
         if target is None:
+            self.idle_steps = math.inf
             return None
 
+        # rotates toward target even while cooling down, so can't idle
+        self.idle_steps = 0
+
         # Rotate toward target
         angle = angle_between(self.position, target.position)
         partial_angle = rotate_toward(self.rotation, angle, self.rotation_threshold)
@@ -294,8 +426,8 @@ class MissileTower(SimpleTower):
         self.cool_down.start()
 
         # Spawn missile on tower
-        missile = Missile(self.position, self.cell_size, target, rotation=self.rotation,
-                          damage=self.get_damage(), grid_speed=.3)
+        missile = self.create_obstacle(units, Missile, self.position, self.cell_size, target,
+                                       rotation=self.rotation, damage=self.get_damage(), grid_speed=.3)
 
         # Move missile to outer edge of tower
         radius = self.grid_size[0] / 2
@@ -306,7 +438,15 @@ class MissileTower(SimpleTower):
 
 
 class Pulse(AbstractObstacle):
-    """A projectile fired from a PulseTower that damages all enemies it collides with"""
+    """A projectile fired from a PulseTower that damages all enemies it collides with
+
+    Attributes:
+        collisions (list<AbstractEnemy>): The enemies this pulse will collide with over its next
+                                          step, if found in advance for every pulse at once
+                                          (see EnemyStore.get_all_in_boxes), else None
+    """
+    __slots__ = ['direction', 'collisions', '_damaged', '_hit_count']
+
     name = "Pulse"
     colour = '#7F191C'  # Falu
 
@@ -319,12 +459,40 @@ class Pulse(AbstractObstacle):
 
     def __init__(self, position, cell_size, direction, size=.04,
                  rotation: Union[int, float] = 0, grid_speed=.15, damage=50, hits=20):
-        super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
+        # pylint: disable=super-init-not-called
+        self._damaged = set()
+        Pulse.reset(self, position, cell_size, direction, size, rotation, grid_speed, damage, hits)
+
+    def reset(self, position, cell_size, direction, size=.04,
+              rotation: Union[int, float] = 0, grid_speed=.15, damage=50, hits=20):
+        """Reinitialises this pulse, keeping the set of enemies it damaged, emptied by release
+        (see AbstractObstacle.reset)"""
+        super().reset(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
 
         self.direction = direction
-        self._damaged = set()
+        self.collisions = None
         self._hit_count = hits
 
+    def release(self):
+        """Forgets the enemies this pulse has damaged, once it has expired (see AbstractObstacle.release)"""
+        self._damaged.clear()
+        self.collisions = None
+
+    def get_swept_box(self):
+        """Returns the box swept by this pulse over its next step, as ((left, top), (right, bottom))"""
+        dx, dy = tuple(self.speed * i for i in self.direction)
+
+        x1, y1 = self.position
+        x2, y2 = x1 + dx, y1 + dy
+
+        if x2 < x1:
+            x1, x2 = x2, x1
+
+        if y2 < y1:
+            y1, y2 = y2, y1
+
+        return (x1, y1), (x2, y2)
+
     def step(self, units):
         """Performs a time step for this pulse
 
@@ -332,6 +500,9 @@ class Pulse(AbstractObstacle):
         If hits is non-zero, this pulse expires if it has the number of enemies hit is at least 'hits',
         else continues until off the grid
 
+        Enemies are taken from collisions if they were found in advance, else searched for in
+        every bucket the step passes through
+
         Parameters:
             units.enemies (UnitManager): The unit manager to select targets from
 
@@ -340,39 +511,33 @@ class Pulse(AbstractObstacle):
                 - persist (bool): True if the obstacle should persist in the game (else will be removed)
                 - new_obstacles (list[AbstractObstacle]): A list of new obstacles to add to the game, or None
         """
+        top_left, bottom_right = self.get_swept_box()
         dx, dy = tuple(self.speed * i for i in self.direction)
 
         x, y = old_position = self.position
-        self.position = new_position = x + dx, y + dy
+        self.position = x + dx, y + dy
+
+        collisions, self.collisions = self.collisions, None
 
-        try:
-            old_bucket = units.enemies.get_bucket_for_position(old_position)
-            new_bucket = units.enemies.get_bucket_for_position(self.position)
-        except IndexError:
+        # expires once it has left the grid (the area enemies are bucketed over)
+        in_bounds = units.enemies.is_position_in_bounds
+        if not (in_bounds(old_position) and in_bounds(self.position)):
             return False, None
 
-        for enemy in old_bucket.union(new_bucket):
+        if collisions is None:
+            # every bucket the step passes through, as a fast pulse can skip over buckets
+            collisions = (enemy for enemy in units.enemies.get_units_in_box(top_left, bottom_right)
+                          if rectangles_intersect(top_left, bottom_right, *enemy.get_bounding_box()))
+
+        for enemy in collisions:
             if enemy in self._damaged:
                 continue
 
-            x1, y1 = old_position
-            x2, y2 = new_position
-
-            if x2 < x1:
-                x1, x2 = x2, x1
+            enemy.damage(self.damage, 'pulse')
+            self._damaged.add(enemy)
 
-            if y2 < y1:
-                y1, y2 = y2, y1
-
-            tl1, br1 = (x1, y1), (x2, y2)
-            tl2, br2 = enemy.get_bounding_box()
-
-            if rectangles_intersect(tl1, br1, tl2, br2):
-                enemy.damage(self.damage, 'pulse')
-                self._damaged.add(enemy)
-
-                if self._hit_count and len(self._damaged) >= self._hit_count:
-                    return False, None
+            if self._hit_count and len(self._damaged) >= self._hit_count:
+                return False, None
 
         return True, None
 
@@ -394,20 +559,65 @@ class PulseTower(AbstractTower):
         self.cool_down.step()
 
         if not self.cool_down.is_done():
+            self.idle_steps = self.cool_down.current - 1
             return None
 
-        target = self.get_unit_in_range(units.enemies)
+        target = self.get_target(units)
 
         if target is None:
+            self.idle_steps = math.inf
             return None
 
         self.cool_down.start()
+        self.idle_steps = self.cool_down.current - 1
 
         pulses = []
 
         for direction in Pulse.DIRECTIONS:
-            pulse = Pulse(self.position, self.cell_size, direction)
+            pulse = self.create_obstacle(units, Pulse, self.position, self.cell_size, direction)
             pulse.move_by(Point2D(*direction) * (.4 * self.cell_size))
             pulses.append(pulse)
 
         return pulses
+
+
+class ProjectilePool:
+    """Expired obstacles (i.e. missiles & pulses), kept to be reset as new ones rather than
+    allocating (& later collecting) a new object for every shot
+
+    Attributes:
+        created (int): The number of obstacles created by constructing a new object
+        recycled (int): The number of obstacles created by reinitialising an expired one
+    """
+    # The most expired obstacles of each type to keep
+    MAX_FREE = 1024
+
+    def __init__(self):
+        self._free = {}
+        self.created = self.recycled = 0
+
+    def create(self, obstacle_class, *args, **kwargs):
+        """(AbstractObstacle) Returns a new obstacle of 'obstacle_class', constructed with 'args' & 'kwargs'"""
+        free = self._free.get(obstacle_class)
+        if not free:
+            self.created += 1
+            return obstacle_class(*args, **kwargs)
+
+        self.recycled += 1
+        obstacle = free.pop()
+        obstacle.reset(*args, **kwargs)
+        return obstacle
+
+    def release(self, obstacle):
+        """Keeps 'obstacle', which has expired & been removed from the game, for reuse
+
+        The obstacle must not be referenced by the game (or anything else) afterward
+        """
+        free = self._free.setdefault(type(obstacle), [])
+        if len(free) < self.MAX_FREE:
+            obstacle.release()
+            free.append(obstacle)
+
+    def __len__(self):
+        """(int) Returns the number of expired obstacles kept for reuse"""
+        return sum(len(free) for free in self._free.values())
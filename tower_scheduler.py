@@ -0,0 +1,142 @@
+"""
+Scheduling of towers around the steps they spend idle
+
+Most towers spend most steps doing nothing but cooling down, either after
+firing or while no enemy is in range, yet would be stepped (and search for
+targets) every step. A TowerScheduler instead puts such towers to sleep, waking
+them when their cool down is about to expire (from a heap keyed on the step to
+wake), or when an enemy enters a bucket their range overlaps
+"""
+
+import heapq
+import math
+
+
+class TowerScheduler:
+    """Chooses the towers to step in each step, so that idle towers cost nothing
+
+    Towers report how long they will be idle after every step (see AbstractTower.idle_steps),
+    and are caught up on the steps they slept through once woken (see AbstractTower.skip_steps),
+    so stepping only the towers awake is equivalent to stepping every tower
+    """
+
+    def __init__(self):
+        """Constructor, scheduling no towers until synced (see sync)"""
+        self._tick = 0
+        self._towers = []
+        self._last_steps = {}
+
+        # indices into self._towers, of towers awake (in order), sleeping until a step,
+        # & sleeping until a watched bucket is occupied, respectively
+        self._awake = []
+        self._timers = []
+        self._watches = {}
+        self._watched = {}
+        self._layout_version = None
+
+    def sync(self, towers):
+        """Schedules 'towers' from now on, in place of the towers scheduled before, waking every one
+
+        Parameters:
+            towers (iter<AbstractTower>): The towers in the game, in the order to step them
+        """
+        self._towers = towers = list(towers)
+        self._last_steps = {tower: self._last_steps.get(tower, self._tick) for tower in towers}
+
+        self._awake = list(range(len(towers)))
+        self._timers = []
+        self._watches = {}
+        self._watched = {}
+
+    def __len__(self):
+        """(int) Returns the number of towers awake"""
+        return len(self._awake)
+
+    def wake(self, is_occupied, layout_version=None):
+        """Advances to the next step, waking the towers that may act in it
+
+        Every tower returned has been caught up on the steps it slept through
+
+        Parameters:
+            is_occupied (func<tuple<int, int>>): Returns True iff an enemy may be within
+                                                 the bucket at a (column, row) index
+            layout_version (int): The version of the bucket layout indexed (see BucketManager),
+                                  which wakes every watching tower when it changes
+
+        Return:
+            list<AbstractTower>: The towers awake, in the order to step them
+        """
+        self._tick += 1
+        tick = self._tick
+
+        woken = []
+        timers = self._timers
+        while timers and timers[0][0] <= tick:
+            woken.append(heapq.heappop(timers)[1])
+
+        if layout_version != self._layout_version:
+            self._layout_version = layout_version
+            woken.extend(self._watched)
+            self._watches = {}
+            self._watched = {}
+        else:
+            for bucket in [bucket for bucket in self._watches if is_occupied(bucket)]:
+                for index in list(self._watches.get(bucket, ())):
+                    self._unwatch(index)
+                    woken.append(index)
+
+        if woken:
+            self._awake.extend(woken)
+            self._awake.sort()
+
+        towers = [self._towers[index] for index in self._awake]
+
+        last_steps = self._last_steps
+        for tower in towers:
+            skipped = tick - last_steps[tower] - 1
+            if skipped:
+                tower.skip_steps(skipped)
+            last_steps[tower] = tick
+
+        return towers
+
+    def settle(self, get_buckets, is_occupied):
+        """Puts the towers awake to sleep, after they have been stepped, if they will be idle
+
+        Parameters:
+            get_buckets (func<AbstractTower>): Returns the (column, row) indices of the buckets
+                                               a tower's range overlaps, else None if unbounded
+            is_occupied (func<tuple<int, int>>): As for wake
+        """
+        awake = []
+
+        for index in self._awake:
+            tower = self._towers[index]
+            idle_steps = tower.idle_steps
+
+            if not idle_steps:
+                awake.append(index)
+            elif idle_steps == math.inf:
+                buckets = get_buckets(tower)
+                if buckets is None or any(map(is_occupied, buckets)):
+                    awake.append(index)
+                else:
+                    self._watch(index, buckets)
+            else:
+                heapq.heappush(self._timers, (self._tick + idle_steps + 1, index))
+
+        self._awake = awake
+
+    def _watch(self, index, buckets):
+        """Sleeps the tower at 'index' until any of 'buckets' are occupied"""
+        self._watched[index] = buckets
+        for bucket in buckets:
+            self._watches.setdefault(bucket, set()).add(index)
+
+    def _unwatch(self, index):
+        """Stops watching buckets for the tower at 'index'"""
+        for bucket in self._watched.pop(index):
+            watchers = self._watches[bucket]
+            watchers.discard(index)
+            if not watchers:
+                del self._watches[bucket]
@@ -3,7 +3,6 @@ General & Geometric Utilities
 """
 
 import math
-import tkinter as tk
 from typing import Union, Tuple
 from inspect import getmembers, isfunction
 
@@ -147,80 +146,6 @@ def inherit_docstrings(cls):
     return cls
 
 
-class Stepper:
-    """Asynchronous control class to emulate non-blocking loop for
-    tkinter GUI application by repeatedly runnning step function
-    after a given interval
-    
-    Can be stopped/paused
-    """
-
-    def __init__(self, master: Union[tk.Widget, tk.Tk], delay: int = 30):
-        """Constructor
-        
-        Parameters:
-            master (tk.Widget|tk.Tk): The tkinter master widget
-            delay (int): The number of milliseconds between each _step
-                         (does not include time taken to run _step)
-        """
-        self._master = master
-        self._step_number = -1
-        self._paused = False
-        self._delay = delay
-        self._after_id = None
-
-    def is_started(self):
-        """(bool) Returns True iff the stepper is started"""
-        return self._after_id is not None
-
-    def is_stopped(self):
-        """(bool) Returns True iff the stepper is stopped"""
-        return self._after_id is None and not self._paused
-
-    def is_paused(self):
-        """(bool) Returns True iff the stepper is paused"""
-        return self._paused
-
-    def start(self):
-        """Start the stepper"""
-        if self.is_started():
-            return
-        self._paused = False
-        self._after_id = self._master.after(self._delay, self._step_manager)
-
-    def stop(self):
-        """Stop the stepper & reset steps to 0"""
-        if self.is_stopped():
-            return
-        if not self.is_paused():
-            self._paused = False
-            self._master.after_cancel(self._after_id)
-            self._after_id = None
-        self._step_number = -1
-
-    def pause(self):
-        """Pause the stepper (does not reset steps to 0)"""
-        if self.is_paused() or self.is_stopped():
-            return
-        self._paused = True
-        self._master.after_cancel(self._after_id)
-        self._after_id = None
-
-    def _step_manager(self):
-        """Internal wrapper around step method to keep track of the number of steps and queue next step"""
-        self._step_number += 1
-
-        if self._step() and not self.is_stopped():
-            self._after_id = self._master.after(self._delay, self._step_manager)
-
-    def _step(self):
-        """(bool) Performs a step
-        
-        Returns True if stepping should continue
-        """
-        raise NotImplementedError("_step must be implemented by a subclass")
-
-
 class Countdown:
     """A simple decrementing counter"""
     current: int = 0
@@ -239,7 +164,18 @@ class Countdown:
         """(bool) Returns True iff this countdown is finished"""
         return self.current == 0
 
-    def step(self):
-        """Decrements the counter if possible"""
+    def step(self, steps=1):
+        """Decrements the counter by 'steps', stopping at zero"""
         if self.current > 0:
-            self.current -= 1
+            self.current = max(0, self.current - steps)
+
+
+def __getattr__(name):
+    """Lazily provides Stepper, which has moved to the stepper module, for backwards compatibility
+
+    Importing it here directly would make every user of utilities depend on tkinter
+    """
+    if name == 'Stepper':
+        from stepper import Stepper
+        return Stepper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")